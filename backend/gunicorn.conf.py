@@ -0,0 +1,49 @@
+# Gunicorn settings for the LERA API. Used by render.yaml / Procfile:
+#   gunicorn -c gunicorn.conf.py server.wsgi:app
+# Every value can be overridden through the environment.
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5555')}"
+
+# Worker processes: 2 x cores + 1, capped so small instances don't run out of memory
+cores = multiprocessing.cpu_count()
+workers = int(os.environ.get('WEB_CONCURRENCY', min(cores * 2 + 1, 8)))
+
+# gthread workers keep slow requests from blocking a whole process; set
+# GUNICORN_THREADS=1 for plain sync workers (which refuse seat streams)
+request_threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread' if request_threads > 1 else 'sync')
+
+# Each open seat stream holds a thread until the client leaves, so gthread
+# workers get one per allowed stream (SSE_MAX_STREAMS, same default as
+# server/config.py) on top of the threads for ordinary requests
+stream_threads = int(os.environ.get('SSE_MAX_STREAMS', 32)) if worker_class == 'gthread' else 0
+threads = request_threads + stream_threads
+
+# Import the app once in the master and fork it into the workers. The
+# SQLAlchemy pool is reset in each child (see create_app), so workers never
+# share connections opened by the master.
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+# Recycle workers periodically; jitter keeps them from restarting together
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    server.log.info("Worker spawned (pid: %s, class: %s, threads: %s)",
+                    worker.pid, worker_class, threads)
+
+
+def worker_exit(server, worker):
+    # Write view counts still buffered in this worker
+    from server.views import view_counter
+    view_counter.flush()
@@ -0,0 +1,30 @@
+"""partition bookings by month on PostgreSQL
+
+Copies bookings into a table range-partitioned on created_at (see
+server/partitions.py); the table is locked while rows are copied. Does
+nothing on SQLite.
+
+Revision ID: 0b7e5d31c8a6
+Revises: f4a09b7d25c1
+Create Date: 2026-10-19 14:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from server.partitions import partition_bookings, unpartition_bookings
+
+
+# revision identifiers, used by Alembic.
+revision = '0b7e5d31c8a6'
+down_revision = 'f4a09b7d25c1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    partition_bookings(op.get_bind())
+
+
+def downgrade():
+    unpartition_bookings(op.get_bind())
@@ -0,0 +1,45 @@
+"""add bookings.version for optimistic concurrency
+
+Also added to bookings_archive when it exists. On PostgreSQL the column
+is added to the partitioned table and so to every partition.
+
+Revision ID: 5e8a1f27c9d3
+Revises: 9d2c6e48b0a7
+Create Date: 2026-10-19 16:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8a1f27c9d3'
+down_revision = '9d2c6e48b0a7'
+branch_labels = None
+depends_on = None
+
+
+def _tables(with_version):
+    """The tables that have (or lack) a version column. create_all() may
+    have made bookings_archive with it already, or not made it at all."""
+    inspector = sa.inspect(op.get_bind())
+    tables = []
+    for table in ('bookings', 'bookings_archive'):
+        if not inspector.has_table(table):
+            continue
+        has_version = any(column['name'] == 'version' for column in inspector.get_columns(table))
+        if has_version == with_version:
+            tables.append(table)
+    return tables
+
+
+def upgrade():
+    for table in _tables(with_version=False):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    for table in _tables(with_version=True):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('version')
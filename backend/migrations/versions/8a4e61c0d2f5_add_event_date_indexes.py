@@ -0,0 +1,28 @@
+"""add event date indexes
+
+Revision ID: 8a4e61c0d2f5
+Revises: 3f1c2a9d7b10
+Create Date: 2026-10-19 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4e61c0d2f5'
+down_revision = '3f1c2a9d7b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.create_index('ix_events_date', ['date'], unique=False)
+        batch_op.create_index('ix_events_category_id_date', ['category_id', 'date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.drop_index('ix_events_category_id_date')
+        batch_op.drop_index('ix_events_date')
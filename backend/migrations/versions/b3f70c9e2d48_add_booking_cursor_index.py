@@ -0,0 +1,29 @@
+"""index bookings on (user_id, created_at, id) for cursor pagination
+
+Replaces ix_bookings_user_id_created_at, which is a prefix of the new
+index. On PostgreSQL both are created on the partitioned table.
+
+Revision ID: b3f70c9e2d48
+Revises: 5e8a1f27c9d3
+Create Date: 2026-10-19 17:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3f70c9e2d48'
+down_revision = '5e8a1f27c9d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_bookings_user_id_created_at_id', 'bookings', ['user_id', 'created_at', 'id'], unique=False)
+    op.drop_index('ix_bookings_user_id_created_at', table_name='bookings')
+
+
+def downgrade():
+    op.create_index('ix_bookings_user_id_created_at', 'bookings', ['user_id', 'created_at'], unique=False)
+    op.drop_index('ix_bookings_user_id_created_at_id', table_name='bookings')
@@ -0,0 +1,47 @@
+"""add foreign key indexes and unique review per user
+
+Revision ID: c52d9e7a1f34
+Revises: 8a4e61c0d2f5
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c52d9e7a1f34'
+down_revision = '8a4e61c0d2f5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.create_index('ix_events_organizer_id', ['organizer_id'], unique=False)
+
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.create_index('ix_bookings_user_id_created_at', ['user_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_bookings_event_id', ['event_id'], unique=False)
+
+    # Keep the earliest review where a user reviewed an event more than once
+    op.execute(
+        "DELETE FROM reviews WHERE id NOT IN "
+        "(SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM reviews GROUP BY user_id, event_id) AS earliest)"
+    )
+    with op.batch_alter_table('reviews', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_reviews_user_id_event_id', ['user_id', 'event_id'])
+        batch_op.create_index('ix_reviews_event_id_created_at', ['event_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('reviews', schema=None) as batch_op:
+        batch_op.drop_index('ix_reviews_event_id_created_at')
+        batch_op.drop_constraint('uq_reviews_user_id_event_id', type_='unique')
+
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.drop_index('ix_bookings_event_id')
+        batch_op.drop_index('ix_bookings_user_id_created_at')
+
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.drop_index('ix_events_organizer_id')
@@ -0,0 +1,47 @@
+"""soft-delete events and cascade event deletes in the database
+
+Revision ID: e81b4f6c3a92
+Revises: c52d9e7a1f34
+Create Date: 2026-10-19 13:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e81b4f6c3a92'
+down_revision = 'c52d9e7a1f34'
+branch_labels = None
+depends_on = None
+
+# SQLite foreign keys are unnamed; batch mode names them with this convention
+naming_convention = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+
+def _event_fk_name(table):
+    if op.get_bind().dialect.name == 'sqlite':
+        return f'fk_{table}_event_id_events'
+    return f'{table}_event_id_fkey'  # PostgreSQL's default name
+
+
+def _replace_event_fk(table, ondelete):
+    with op.batch_alter_table(table, schema=None, naming_convention=naming_convention) as batch_op:
+        batch_op.drop_constraint(_event_fk_name(table), type_='foreignkey')
+        batch_op.create_foreign_key(_event_fk_name(table), 'events', ['event_id'], ['id'], ondelete=ondelete)
+
+
+def upgrade():
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+
+    _replace_event_fk('bookings', 'CASCADE')
+    _replace_event_fk('reviews', 'CASCADE')
+
+
+def downgrade():
+    _replace_event_fk('reviews', None)
+    _replace_event_fk('bookings', None)
+
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.drop_column('deleted_at')
@@ -0,0 +1,40 @@
+"""never reuse event, booking and review ids on SQLite
+
+Archived rows keep their ids, so SQLite must not hand out the id of a
+row that was moved to an archive table. PostgreSQL sequences never
+reuse ids, so this is a no-op there. The archive tables themselves are
+created by db.create_all() at startup.
+
+Revision ID: f4a09b7d25c1
+Revises: e81b4f6c3a92
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4a09b7d25c1'
+down_revision = 'e81b4f6c3a92'
+branch_labels = None
+depends_on = None
+
+TABLES = ('events', 'bookings', 'reviews')
+
+
+def _recreate(autoincrement):
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for table in TABLES:
+        with op.batch_alter_table(table, recreate='always',
+                                  table_kwargs={'sqlite_autoincrement': autoincrement}):
+            pass
+
+
+def upgrade():
+    _recreate(True)
+
+
+def downgrade():
+    _recreate(False)
@@ -3,5 +3,16 @@ from .event import Event
 from .booking import Booking
 from .category import Category
 from .review import Review
+from .change import Change
+from .session import UserSession
+from .refresh_token import RefreshToken
+from .recommendation import EventRecommendation
+from .trending import EventTrending
+from .event_view import EventView
+from .archive import ArchivedEvent, ArchivedBooking, ArchivedReview
 
-__all__ = ['db', 'User', 'Event', 'Booking', 'Category', 'Review']
+__all__ = [
+    'db', 'User', 'Event', 'Booking', 'Category', 'Review', 'Change',
+    'UserSession', 'RefreshToken', 'EventRecommendation', 'EventTrending',
+    'EventView', 'ArchivedEvent', 'ArchivedBooking', 'ArchivedReview',
+]
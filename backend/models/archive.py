@@ -0,0 +1,57 @@
+from .user import db
+from .event import Event
+from .booking import Booking
+from .review import Review
+
+
+def _archive_table(model, *indexes):
+    """Same columns as ``model``'s table, minus foreign keys and defaults,
+    for rows moved out of it by server/archive.py."""
+    columns = [
+        db.Column(column.name, column.type, primary_key=column.primary_key,
+                  nullable=column.nullable, autoincrement=False)
+        for column in model.__table__.columns
+    ]
+    return db.Table(f'{model.__tablename__}_archive', db.metadata, *columns, *indexes)
+
+
+class ArchivedEvent(db.Model):
+    __table__ = _archive_table(
+        Event,
+        db.Index('ix_events_archive_date', 'date'),
+        db.Index('ix_events_archive_organizer_id', 'organizer_id'),
+    )
+
+    serializable_fields = Event.serializable_fields
+
+    def to_dict(self, fields=None):
+        return {**Event.to_dict(self, fields=fields), 'archived': True}
+
+
+class ArchivedBooking(db.Model):
+    __table__ = _archive_table(
+        Booking,
+        db.Index('ix_bookings_archive_user_id_created_at', 'user_id', 'created_at'),
+        db.Index('ix_bookings_archive_event_id', 'event_id'),
+    )
+
+    def to_dict(self):
+        return {**Booking.to_dict(self), 'archived': True}
+
+
+class ArchivedReview(db.Model):
+    __table__ = _archive_table(
+        Review,
+        db.Index('ix_reviews_archive_event_id_created_at', 'event_id', 'created_at'),
+    )
+
+    def to_dict(self):
+        return {**Review.to_dict(self), 'archived': True}
+
+
+# Hot model -> archive model
+ARCHIVES = {
+    Event: ArchivedEvent,
+    Booking: ArchivedBooking,
+    Review: ArchivedReview,
+}
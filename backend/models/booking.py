@@ -1,4 +1,5 @@
 from sqlalchemy_serializer import SerializerMixin
+from server.partitions import partition_bookings
 from .user import db
 
 
@@ -9,23 +10,40 @@ class Booking(db.Model, SerializerMixin):
     tickets_count = db.Column(db.Integer, nullable=False, default=1)
     total_price = db.Column(db.Float, nullable=False)
     status = db.Column(db.String(20), default='pending')  # pending, confirmed, cancelled
-    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    created_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now())  # partition key on PostgreSQL
 
     # Foreign keys
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id', ondelete='CASCADE'), nullable=False)
 
     # User-submittable attribute
     special_requests = db.Column(db.Text)
 
+    # Checked and incremented on every ORM update, as on Event
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+
+    # user_id first so one index serves both the foreign key and a user's
+    # bookings by date; id breaks ties for cursor pagination. Ids are never
+    # reused, as archived rows keep theirs.
+    __table_args__ = (
+        db.Index('ix_bookings_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        db.Index('ix_bookings_event_id', 'event_id'),
+        {'sqlite_autoincrement': True},
+    )
+
+    __mapper_args__ = {'version_id_col': version}
+
     # Serialization rules
     serialize_rules = (
         '-user.bookings',
         '-event.bookings',
     )
 
-    def to_dict(self):
-        return {
+    # Relationships that list endpoints may eager-load via ?expand=
+    expandable = ('event',)
+
+    def to_dict(self, expand=()):
+        data = {
             'id': self.id,
             'user_id': self.user_id,
             'event_id': self.event_id,
@@ -33,5 +51,15 @@ class Booking(db.Model, SerializerMixin):
             'total_price': self.total_price,
             'status': self.status,
             'special_requests': self.special_requests,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'version': self.version
         }
+        if 'event' in expand:
+            data['event'] = self.event.to_dict() if self.event else None
+        return data
+
+
+@db.event.listens_for(Booking.__table__, 'after_create')
+def _partition_new_table(target, connection, **kw):
+    # create_all() makes a plain table; on PostgreSQL partition it by month
+    partition_bookings(connection)
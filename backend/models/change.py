@@ -0,0 +1,120 @@
+import threading
+from collections import deque
+from sqlalchemy import event as sa_event, text
+from sqlalchemy.orm import Session
+from .user import db
+from .event import Event
+from .category import Category
+from .review import Review
+
+
+class Change(db.Model):
+    __tablename__ = 'changes'
+
+    # Append-only log; seq is never reused so clients can resume from it
+    seq = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    entity = db.Column(db.String(20), nullable=False)  # event, category, review
+    entity_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False)  # insert, update, delete
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+
+    __table_args__ = (
+        db.Index('ix_changes_entity_seq', 'entity', 'entity_id', 'seq'),
+        {'sqlite_autoincrement': True},
+    )
+
+    def to_dict(self):
+        return {
+            'seq': self.seq,
+            'entity': self.entity,
+            'id': self.entity_id,
+            'op': self.op,
+        }
+
+
+# Models whose writes are recorded in the change log
+TRACKED_ENTITIES = {
+    Event: 'event',
+    Category: 'category',
+    Review: 'review',
+}
+
+
+def compact_changes():
+    """Drop entries superseded by a later change to the same row.
+
+    Deltas carry no payload, so only the newest entry per row matters to a
+    syncing client. Returns the number of rows removed.
+    """
+    latest = (db.select(db.func.max(Change.seq))
+              .group_by(Change.entity, Change.entity_id)
+              .scalar_subquery())
+    result = db.session.execute(db.delete(Change).where(Change.seq.not_in(latest)))
+    db.session.commit()
+    return result.rowcount
+
+
+# (next transaction id, last seq handed out) pairs seen by this process,
+# oldest first; see settled_seq()
+_watermarks = deque(maxlen=1024)
+_settled = 0
+_watermarks_lock = threading.Lock()
+
+
+def settled_seq(connection):
+    """Highest seq at or below which no more changes can appear, or None
+    where writes are serialized (SQLite) and every visible seq is final.
+
+    On PostgreSQL seq is taken at INSERT but becomes visible at COMMIT, so
+    a lower seq can show up after a higher one. Each call notes the last
+    seq handed out, then the next transaction id. Once the oldest running
+    transaction is newer than that id, every seq up to the noted one is
+    final. This relies on change rows being written after the row they
+    describe, so their transaction already has an id when it takes a seq.
+    """
+    global _settled
+    if connection.dialect.name != 'postgresql':
+        return None
+    last = connection.execute(text(
+        "SELECT pg_sequence_last_value(pg_get_serial_sequence('changes', 'seq')::regclass)"
+    )).scalar() or 0
+    # A separate statement, so its snapshot is taken after the read above
+    xmin, xmax = connection.execute(text(
+        "SELECT pg_snapshot_xmin(s)::text::bigint, pg_snapshot_xmax(s)::text::bigint "
+        "FROM pg_current_snapshot() s"
+    )).one()
+    with _watermarks_lock:
+        _watermarks.append((xmax, last))
+        while _watermarks and _watermarks[0][0] <= xmin:
+            _settled = max(_settled, _watermarks.popleft()[1])
+        return _settled
+
+
+def record_changes(connection, entity, ids, op):
+    """Log writes made with Core statements, which the flush hook below
+    doesn't see."""
+    if ids:
+        connection.execute(Change.__table__.insert(), [
+            {'entity': entity, 'entity_id': id, 'op': op} for id in ids
+        ])
+
+
+@sa_event.listens_for(Session, 'after_flush')
+def _log_changes(session, flush_context):
+    rows = []
+    for obj in session.new:
+        entity = TRACKED_ENTITIES.get(type(obj))
+        if entity:
+            rows.append({'entity': entity, 'entity_id': obj.id, 'op': 'insert'})
+    for obj in session.dirty:
+        entity = TRACKED_ENTITIES.get(type(obj))
+        if entity and session.is_modified(obj, include_collections=False):
+            # Soft-deleting an event is a delete as far as clients are concerned
+            op = 'delete' if getattr(obj, 'deleted_at', None) else 'update'
+            rows.append({'entity': entity, 'entity_id': obj.id, 'op': op})
+    for obj in session.deleted:
+        entity = TRACKED_ENTITIES.get(type(obj))
+        if entity:
+            rows.append({'entity': entity, 'entity_id': obj.id, 'op': 'delete'})
+    if rows:
+        session.connection().execute(Change.__table__.insert(), rows)
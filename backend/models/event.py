@@ -1,4 +1,7 @@
+from datetime import datetime
+from sqlalchemy.orm import Session, with_loader_criteria
 from sqlalchemy_serializer import SerializerMixin
+from server.geo import geohash_encode
 from .user import db
 
 
@@ -14,24 +17,53 @@ class Event(db.Model, SerializerMixin):
     capacity = db.Column(db.Integer, nullable=False)
     created_at = db.Column(db.DateTime, server_default=db.func.now())
 
+    # Set by DELETE /api/events/<id>; the row and its bookings and reviews
+    # are removed later by the purge-events command
+    deleted_at = db.Column(db.DateTime)
+
+    # Incremented by every update and served as the ETag. The ORM checks it
+    # on flush (version_id_col below), so a row changed by another request
+    # raises StaleDataError instead of being overwritten.
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+
+    # Optional coordinates; geohash is derived from them (see below) and
+    # indexed so nearby searches can range-scan by cell prefix
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+    geohash = db.Column(db.String(12), index=True)
+
     # Foreign keys
     organizer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     category_id = db.Column(db.Integer, db.ForeignKey('categories.id'))
 
-    # Relationships
+    # Relationships; the database cascades deletes, so deleting an event
+    # doesn't load its children
     bookings = db.relationship(
         'Booking',
         backref='event',
         lazy=True,
-        cascade='all, delete-orphan'
+        cascade='all, delete-orphan',
+        passive_deletes=True
     )
     reviews = db.relationship(
         'Review',
         backref='event',
         lazy=True,
-        cascade='all, delete-orphan'
+        cascade='all, delete-orphan',
+        passive_deletes=True
     )
 
+    # Range scans for calendar views, overall and per category. Ids are
+    # never reused (SQLite would otherwise), since archived rows keep theirs.
+    __table_args__ = (
+        db.Index('ix_events_date', 'date'),
+        db.Index('ix_events_category_id_date', 'category_id', 'date'),
+        db.Index('ix_events_organizer_id', 'organizer_id'),
+        {'sqlite_autoincrement': True},
+    )
+
+    __mapper_args__ = {'version_id_col': version}
+
     # Serialization rules
     serialize_rules = (
         '-organizer.events',
@@ -39,16 +71,49 @@ class Event(db.Model, SerializerMixin):
         '-reviews.event',
     )
 
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'date': self.date.isoformat() if self.date else None,
-            'location': self.location,
-            'price': self.price,
-            'capacity': self.capacity,
-            'organizer_id': self.organizer_id,
-            'category_id': self.category_id,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+    # Columns embedded in other rows' responses, e.g. a user's bookings
+    summary_fields = ('id', 'title', 'date', 'location')
+
+    # Relationships that list endpoints may eager-load via ?expand=
+    expandable = ('organizer', 'category')
+
+    # Columns clients may select via ?fields=, in serialization order
+    serializable_fields = (
+        'id', 'title', 'description', 'date', 'location', 'price',
+        'capacity', 'organizer_id', 'category_id', 'created_at',
+        'latitude', 'longitude', 'version',
+    )
+
+    def to_dict(self, fields=None, expand=()):
+        # Only touch the requested columns so deferred ones are never loaded
+        data = {}
+        for name in fields or self.serializable_fields:
+            value = getattr(self, name)
+            data[name] = value.isoformat() if isinstance(value, datetime) else value
+        if 'organizer' in expand:
+            data['organizer'] = self.organizer.to_public_dict() if self.organizer else None
+        if 'category' in expand:
+            data['category'] = self.category.to_dict() if self.category else None
+        return data
+
+
+@db.event.listens_for(Event, 'before_insert')
+@db.event.listens_for(Event, 'before_update')
+def _set_geohash(mapper, connection, target):
+    if target.latitude is None or target.longitude is None:
+        target.geohash = None
+    else:
+        target.geohash = geohash_encode(target.latitude, target.longitude)
+
+
+@db.event.listens_for(Session, 'do_orm_execute')
+def _hide_deleted_events(execute_state):
+    # Soft-deleted events are left out of every ORM query unless it opts in
+    # with .execution_options(include_deleted=True)
+    if (execute_state.is_select
+            and not execute_state.is_column_load
+            and not execute_state.is_relationship_load
+            and not execute_state.execution_options.get('include_deleted', False)):
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(Event, Event.deleted_at.is_(None), include_aliases=True)
+        )
@@ -0,0 +1,10 @@
+from .user import db
+
+
+class EventView(db.Model):
+    __tablename__ = 'event_views'
+
+    # Detail-page views per event, written in batches by server/views.py
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id', ondelete='CASCADE'), primary_key=True)
+    view_count = db.Column(db.BigInteger, nullable=False, default=0)
+    last_viewed_at = db.Column(db.DateTime)
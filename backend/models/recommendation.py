@@ -0,0 +1,14 @@
+from .user import db
+
+
+class EventRecommendation(db.Model):
+    __tablename__ = 'event_recommendations'
+
+    # Top-K similar events per event, written by the recommendations batch
+    # job (server/recommendations.py); the primary key doubles as the
+    # lookup index
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id', ondelete='CASCADE'), primary_key=True)
+    rank = db.Column(db.Integer, primary_key=True)
+    neighbor_id = db.Column(db.Integer, db.ForeignKey('events.id', ondelete='CASCADE'), nullable=False)
+    score = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
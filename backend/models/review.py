@@ -12,7 +12,15 @@ class Review(db.Model, SerializerMixin):
 
     # Foreign keys
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id', ondelete='CASCADE'), nullable=False)
+
+    # One review per user and event; the constraint's index also covers
+    # user_id. Ids are never reused, as archived rows keep theirs.
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'event_id', name='uq_reviews_user_id_event_id'),
+        db.Index('ix_reviews_event_id_created_at', 'event_id', 'created_at'),
+        {'sqlite_autoincrement': True},
+    )
 
     # Serialization rules
     serialize_rules = (
@@ -20,8 +28,11 @@ class Review(db.Model, SerializerMixin):
         '-event.reviews',
     )
 
-    def to_dict(self):
-        return {
+    # Relationships that list endpoints may eager-load via ?expand=
+    expandable = ('user', 'event')
+
+    def to_dict(self, expand=()):
+        data = {
             'id': self.id,
             'user_id': self.user_id,
             'event_id': self.event_id,
@@ -29,3 +40,8 @@ class Review(db.Model, SerializerMixin):
             'comment': self.comment,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+        if 'user' in expand:
+            data['user'] = self.user.to_public_dict() if self.user else None
+        if 'event' in expand:
+            data['event'] = self.event.to_dict() if self.event else None
+        return data
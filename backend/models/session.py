@@ -0,0 +1,11 @@
+from .user import db
+
+
+class UserSession(db.Model):
+    __tablename__ = 'sessions'
+
+    # Server-side session store (see server/sessions.py); the cookie only
+    # carries the random id
+    id = db.Column(db.String(64), primary_key=True)
+    data = db.Column(db.Text, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
@@ -0,0 +1,18 @@
+from .user import db
+
+
+class EventTrending(db.Model):
+    __tablename__ = 'event_trending'
+
+    # Exponentially decayed activity counters (see server/trending.py).
+    # Values are stored forward-decayed, relative to the start of
+    # `generation`, so an increment never has to touch other rows.
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id', ondelete='CASCADE'), primary_key=True)
+    generation = db.Column(db.Integer, nullable=False)
+    booking_score = db.Column(db.Float, nullable=False, default=0.0)
+    view_score = db.Column(db.Float, nullable=False, default=0.0)
+    score = db.Column(db.Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        db.Index('ix_event_trending_generation_score', 'generation', 'score'),
+    )
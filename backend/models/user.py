@@ -52,3 +52,10 @@ class User(db.Model, SerializerMixin):
             'role': self.role,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+
+    # Public subset used when a user is embedded in another resource
+    def to_public_dict(self):
+        return {
+            'id': self.id,
+            'username': self.username
+        }
@@ -1,29 +1,90 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, current_app, g, request, jsonify, session
 from models import db, User
 from functools import wraps
+from server.tokens import (
+    InvalidToken, looks_like_jwt, verify_access_token, issue_access_token,
+    issue_refresh_token, rotate_refresh_token, revoke_refresh_token
+)
+import hmac
+import secrets
 
 auth_bp = Blueprint('auth', __name__)
 
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+class CSRFError(Exception):
+    pass
+
+def load_identity():
+    """Set g.user_id and g.role from a bearer access token or the session.
+
+    Returns False when no one is logged in. Bearer values that aren't our
+    access tokens are ignored so session-based clients keep working. The
+    browser attaches the session cookie to cross-site requests too, so
+    unsafe methods authenticated by it must echo the session's CSRF token
+    in X-CSRF-Token; CSRFError is raised otherwise.
+    """
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer ') and looks_like_jwt(header[7:]):
+        # Signed claims: no session or user lookup needed
+        claims = verify_access_token(header[7:])
+        g.user_id, g.role = claims['sub'], claims['role']
+        return True
+    if 'user_id' not in session:
+        return False
+    if request.method not in SAFE_METHODS:
+        expected = session.get('csrf_token')
+        if not expected or not hmac.compare_digest(expected, request.headers.get('X-CSRF-Token', '')):
+            raise CSRFError("Missing or invalid CSRF token")
+    g.user_id, g.role = session['user_id'], session.get('role')
+    return True
+
 def login_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        if 'user_id' not in session:
-            return jsonify({"error": "Unauthorized"}), 401
+        try:
+            if not load_identity():
+                return jsonify({"error": "Unauthorized"}), 401
+        except InvalidToken as e:
+            return jsonify({"error": str(e)}), 401
+        except CSRFError as e:
+            return jsonify({"error": str(e)}), 403
         return f(*args, **kwargs)
     return decorated
 
+def current_user_is_admin():
+    # The role comes from the token or is cached in the session at login;
+    # sessions created before that still fall back to a lookup
+    if g.role is None:
+        user = User.query.get(g.user_id)
+        g.role = user.role if user else None
+    return g.role == 'admin'
+
 def admin_required(f):
+    @login_required
     @wraps(f)
     def decorated(*args, **kwargs):
-        user_id = session.get('user_id')
-        if not user_id:
-            return jsonify({"error": "Unauthorized"}), 401
-        user = User.query.get(user_id)
-        if not user or not user.is_admin():
+        if not current_user_is_admin():
             return jsonify({"error": "Admin access required"}), 403
         return f(*args, **kwargs)
     return decorated
 
+def token_response(user, refresh_token=None):
+    return {
+        'access_token': issue_access_token(user),
+        'refresh_token': refresh_token or issue_refresh_token(user.id),
+        'token_type': 'Bearer',
+        'expires_in': current_app.config['JWT_ACCESS_TTL_SECONDS']
+    }
+
+def start_session(user):
+    session.clear()
+    if hasattr(session, 'regenerate'):
+        session.regenerate()
+    session['user_id'] = user.id
+    session['role'] = user.role
+    session['csrf_token'] = secrets.token_urlsafe(32)
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     data = request.get_json()
@@ -49,9 +110,11 @@ def register():
     db.session.add(user)
     db.session.commit()
     
-    session['user_id'] = user.id
+    start_session(user)
+    tokens = token_response(user)
+    db.session.commit()
     
-    return jsonify(user.to_dict()), 201
+    return jsonify({**user.to_dict(), **tokens}), 201, {'X-CSRF-Token': session['csrf_token']}
 
 @auth_bp.route('/login', methods=['POST'])
 def login():
@@ -61,16 +124,43 @@ def login():
     if not user or not user.check_password(data.get('password', '')):
         return jsonify({"error": "Invalid credentials"}), 401
     
-    session['user_id'] = user.id
-    return jsonify(user.to_dict())
+    start_session(user)
+    tokens = token_response(user)
+    db.session.commit()
+    return jsonify({**user.to_dict(), **tokens}), 200, {'X-CSRF-Token': session['csrf_token']}
+
+@auth_bp.route('/refresh', methods=['POST'])
+def refresh():
+    data = request.get_json(silent=True) or {}
+    if not data.get('refresh_token'):
+        return jsonify({"error": "Missing refresh_token"}), 400
+    
+    try:
+        user_id, refresh_token = rotate_refresh_token(data['refresh_token'])
+    except InvalidToken as e:
+        return jsonify({"error": str(e)}), 401
+    
+    user = User.query.get(user_id)
+    if not user:
+        return jsonify({"error": "Invalid refresh token"}), 401
+    db.session.commit()
+    
+    return jsonify(token_response(user, refresh_token))
 
 @auth_bp.route('/logout', methods=['POST'])
 def logout():
-    session.pop('user_id', None)
+    # Clearing a server-side session deletes it from the store
+    session.clear()
+    data = request.get_json(silent=True) or {}
+    if data.get('refresh_token'):
+        revoke_refresh_token(data['refresh_token'])
+        db.session.commit()
     return jsonify({"message": "Logged out"})
 
 @auth_bp.route('/me', methods=['GET'])
 @login_required
 def get_current_user():
-    user = User.query.get(session['user_id'])
-    return jsonify(user.to_dict())
\ No newline at end of file
+    user = User.query.get(g.user_id)
+    # Lets a reloaded page pick the session's CSRF token up again
+    headers = {'X-CSRF-Token': session['csrf_token']} if 'csrf_token' in session else {}
+    return jsonify(user.to_dict()), 200, headers
\ No newline at end of file
@@ -1,40 +1,197 @@
-from flask import Blueprint, request, jsonify, session
-from models import db, Booking, Event
+from flask import Blueprint, g, request, jsonify
+from datetime import datetime
+from sqlalchemy.orm import load_only
+from models import db, Booking, Event, ArchivedBooking, ArchivedEvent
 from routes.auth import login_required
+from routes.helpers import (parse_expand, parse_flag, event_is_live, if_match_failed, precondition_failed,
+                            commit_or_conflict)
+from server.availability import seat_publisher
+from server.trending import record_activity
 
 bookings_bp = Blueprint('bookings', __name__)
 
+BOOKING_STATUSES = ('pending', 'confirmed', 'cancelled')
+
+def created_conditions(model, args):
+    """created_at filters from ?since= and ?until= (ISO dates). On
+    PostgreSQL they also limit the scan to the matching monthly partitions."""
+    try:
+        since = args.get('since') and datetime.fromisoformat(args['since'])
+        until = args.get('until') and datetime.fromisoformat(args['until'])
+    except ValueError:
+        raise ValueError("since and until must be ISO dates or datetimes")
+    conditions = []
+    if since:
+        conditions.append(model.created_at >= since)
+    if until:
+        conditions.append(model.created_at < until)
+    return conditions
+
 @bookings_bp.route('/', methods=['POST'])
 @login_required
 def create_booking():
     data = request.get_json()
     
+    # Clients may send numbers as strings; the trending counters need ints
+    try:
+        event_id = int(data['event_id'])
+        tickets_count = int(data['tickets_count'])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "event_id and tickets_count must be integers"}), 400
+    if tickets_count < 1:
+        return jsonify({"error": "tickets_count must be at least 1"}), 400
+    if not event_is_live(event_id):
+        return jsonify({"error": "Event not found"}), 404
+    
     booking = Booking(
-        user_id=session['user_id'],
-        event_id=data['event_id'],
-        tickets_count=data['tickets_count'],
+        user_id=g.user_id,
+        event_id=event_id,
+        tickets_count=tickets_count,
         total_price=data.get('total_price', 0),
         special_requests=data.get('special_requests')
     )
     
     db.session.add(booking)
+    record_activity(db.session.connection(), bookings={booking.event_id: booking.tickets_count})
     db.session.commit()
+    seat_publisher.notify(booking.event_id)
     return jsonify(booking.to_dict()), 201
 
+def parse_statuses(value):
+    """?status=confirmed or a comma separated list; None when absent."""
+    statuses = [status.strip() for status in (value or '').split(',') if status.strip()]
+    unknown = [status for status in statuses if status not in BOOKING_STATUSES]
+    if unknown:
+        raise ValueError(f"Unknown status: {', '.join(unknown)}. Allowed: {', '.join(BOOKING_STATUSES)}")
+    return statuses or None
+
+def parse_cursor(value):
+    """(created_at, id) from a previous page's next_cursor."""
+    created_at, _, id = value.rpartition(',')
+    try:
+        return datetime.fromisoformat(created_at), int(id)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+def before_cursor(model, cursor):
+    created_at, id = cursor
+    if db.engine.dialect.name == 'sqlite':
+        # SQLite keeps datetimes as text; CURRENT_TIMESTAMP defaults have no
+        # fraction while ORM-written values always do, and str() matches both
+        created_at = db.literal(str(created_at), db.String)
+    # The plain bound is implied by the row comparison but, unlike it, lets
+    # PostgreSQL skip the monthly partitions newer than the cursor
+    return db.and_(model.created_at <= created_at,
+                   db.tuple_(model.created_at, model.id) < db.tuple_(created_at, id))
+
+def event_onclause(model, event_model):
+    # The session's soft-delete filter doesn't reach explicit joins; a
+    # deleted event's bookings come back with no event
+    return db.and_(event_model.id == model.event_id, event_model.deleted_at.is_(None))
+
+def booking_page(model, event_model, conditions, cursor, limit, expand):
+    """Up to ``limit`` (booking, event) rows, newest first, in one joined
+    query. Only the event's summary columns are loaded unless expanded."""
+    stmt = (db.select(model, event_model)
+            .outerjoin(event_model, event_onclause(model, event_model))
+            .where(*conditions)
+            .order_by(model.created_at.desc(), model.id.desc())
+            .limit(limit))
+    if 'event' not in expand:
+        stmt = stmt.options(load_only(*[getattr(event_model, name) for name in Event.summary_fields]))
+    if cursor:
+        stmt = stmt.where(before_cursor(model, cursor))
+    return db.session.execute(stmt).all()
+
+def booking_summary(model, event_model, conditions):
+    """(status, count, total price, upcoming count) per status."""
+    upcoming = db.case(
+        (db.and_(event_model.date >= datetime.utcnow(), model.status != 'cancelled'), 1),
+        else_=0
+    )
+    return db.session.execute(
+        db.select(model.status, db.func.count(), db.func.sum(model.total_price), db.func.sum(upcoming))
+        .outerjoin(event_model, event_onclause(model, event_model))
+        .where(*conditions)
+        .group_by(model.status)
+    ).all()
+
+# GET the caller's bookings, newest first, a page at a time. The first page
+# also carries a summary of every booking in the since/until range.
 @bookings_bp.route('/', methods=['GET'])
 @login_required
 def get_bookings():
-    bookings = Booking.query.filter_by(user_id=session['user_id']).all()
-    return jsonify([b.to_dict() for b in bookings])
+    sources = [(Booking, Event)]
+    if parse_flag(request.args.get('include_archived')):
+        sources.append((ArchivedBooking, ArchivedEvent))
+    try:
+        expand = parse_expand(request.args.get('expand'), Booking)
+        statuses = parse_statuses(request.args.get('status'))
+        cursor = parse_cursor(request.args['cursor']) if request.args.get('cursor') else None
+        created = {model: created_conditions(model, request.args) for model, _ in sources}
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        limit = int(request.args.get('limit', 50))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= 200:
+        return jsonify({"error": "limit must be an integer from 1 to 200"}), 400
+    
+    def conditions(model, with_status=True):
+        where = [model.user_id == g.user_id, *created[model]]
+        if statuses and with_status:
+            where.append(model.status.in_(statuses))
+        return where
+    
+    # One page from each source, merged; limit + 1 rows tell whether there's more
+    rows = []
+    for model, event_model in sources:
+        rows += booking_page(model, event_model, conditions(model), cursor, limit + 1, expand)
+    rows.sort(key=lambda row: (row[0].created_at, row[0].id), reverse=True)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    bookings = []
+    for booking, event in rows:
+        data = booking.to_dict()
+        data['event'] = event.to_dict(fields=None if 'event' in expand else Event.summary_fields) if event else None
+        bookings.append(data)
+    result = {
+        "bookings": bookings,
+        "next_cursor": f"{rows[-1][0].created_at.isoformat()},{rows[-1][0].id}" if has_more else None,
+        "has_more": has_more
+    }
+    
+    if cursor is None:
+        summary = {"bookings": 0, "by_status": {}, "total_spent": 0.0, "upcoming": 0}
+        for model, event_model in sources:
+            for status, count, total, upcoming in booking_summary(model, event_model, conditions(model, False)):
+                status = status or 'pending'
+                summary["bookings"] += count
+                summary["by_status"][status] = summary["by_status"].get(status, 0) + count
+                if status == 'confirmed':
+                    summary["total_spent"] += total or 0
+                summary["upcoming"] += upcoming or 0
+        summary["total_spent"] = round(summary["total_spent"], 2)
+        result["summary"] = summary
+    
+    return jsonify(result)
 
 @bookings_bp.route('/<int:id>', methods=['DELETE'])
 @login_required
 def delete_booking(id):
     booking = Booking.query.get_or_404(id)
     
-    if booking.user_id != session['user_id']:
+    if booking.user_id != g.user_id:
         return jsonify({"error": "Unauthorized"}), 403
+    if if_match_failed(booking.version):
+        return precondition_failed(booking, 'booking')
     
+    event_id = booking.event_id
     db.session.delete(booking)
-    db.session.commit()
+    conflict = commit_or_conflict(booking, 'booking')
+    if conflict:
+        return conflict
+    seat_publisher.notify(event_id)
     return jsonify({"message": "Booking cancelled"})
\ No newline at end of file
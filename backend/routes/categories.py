@@ -1,9 +1,10 @@
-from flask import Blueprint, jsonify
-from models import Category
+from flask import Blueprint, current_app
+from server.catalog import category_catalog
+from server.compression import precompressed_response
 
 categories_bp = Blueprint('categories', __name__)
 
 @categories_bp.route('/', methods=['GET'])
 def get_categories():
-    categories = Category.query.all()
-    return jsonify([c.to_dict() for c in categories])
\ No newline at end of file
+    # Serialized once per catalog version, see server/catalog.py
+    return precompressed_response(current_app, category_catalog.snapshot().body)
@@ -1,21 +1,437 @@
-from flask import Blueprint, request, jsonify, session
-from datetime import datetime
-from models import db, Event
-from routes.auth import login_required
+from flask import Blueprint, Response, abort, current_app, g, request, jsonify
+import csv
+import io
+import json
+import sqlite3
+from datetime import datetime, timedelta
+from models import db, Event, Category, Review, Change, Booking, EventRecommendation, EventView, ArchivedEvent
+from models.change import record_changes, settled_seq
+from routes.auth import login_required, current_user_is_admin, load_identity
+from routes.helpers import (parse_expand, expand_options, parse_fields, fields_options, parse_flag,
+                            if_match_failed, current_state, precondition_failed, commit_or_conflict)
+from server.availability import seat_publisher, seats_remaining, sse_stream
+from server.compression import PrecompressedBody, precompressed_response
+from server.config import Config
+from server.catalog import category_catalog
+from server.geo import covering_prefixes, geohash_encode, haversine_km, prefix_upper_bound
+from server.recommendations import category_affinity
+from server.singleflight import ResponseCache
+from server.tokens import InvalidToken
+from server.trending import top_event_ids
+from server.views import view_counter
 
 events_bp = Blueprint('events', __name__)
 
+# (serialized event, version) keyed by (id, fields); concurrent requests for
+# the same event share one query
+event_cache = ResponseCache(Config.EVENT_CACHE_TTL_SECONDS, Config.EVENT_CACHE_STALE_SECONDS)
+
+def invalidate_event_cache(event_id):
+    event_cache.invalidate(lambda key: key[0] == event_id)
+
+def parse_event_date(value):
+    """Parse YYYY-MM-DD or an ISO datetime; raises ValueError."""
+    if not isinstance(value, str):
+        raise ValueError("date must be a string")
+    if 'T' in value:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if len(value) == 10 and value[4] == value[7] == '-':
+        return datetime.fromisoformat(value)  # much faster than strptime
+    return datetime.strptime(value, '%Y-%m-%d')
+
+def parse_category_id(value):
+    """Validate a category_id against the cached catalog; None clears it."""
+    if value is None:
+        return None
+    try:
+        category_id = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("category_id must be an integer")
+    if not category_catalog.exists(category_id):
+        raise ValueError(f"Unknown category_id: {category_id}")
+    return category_id
+
+def parse_coordinates(data):
+    """Return (latitude, longitude) from request data; both None if absent."""
+    lat, lng = data.get('latitude'), data.get('longitude')
+    if lat is None and lng is None:
+        return None, None
+    if lat is None or lng is None:
+        raise ValueError("latitude and longitude must be given together")
+    lat, lng = float(lat), float(lng)
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError("latitude must be within ±90 and longitude within ±180")
+    return lat, lng
+
 # GET all events
 @events_bp.route('/', methods=['GET'])
 def get_events():
-    events = Event.query.all()
-    return jsonify([event.to_dict() for event in events])
+    include_archived = parse_flag(request.args.get('include_archived'))
+    try:
+        expand = parse_expand(request.args.get('expand'), Event)
+        fields = parse_fields(request.args.get('fields'), Event)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if expand and include_archived:
+        return jsonify({"error": "expand can't be combined with include_archived"}), 400
+    
+    events = (Event.query
+              .options(*fields_options(Event, fields), *expand_options(Event, expand))
+              .all())
+    result = [event.to_dict(fields=fields, expand=expand) for event in events]
+    if include_archived:
+        archived = ArchivedEvent.query.options(*fields_options(ArchivedEvent, fields)).all()
+        result += [event.to_dict(fields=fields) for event in archived]
+    return jsonify(result)
+
+# GET changes to events, categories and reviews since a sequence number
+@events_bp.route('/changes', methods=['GET'])
+def get_changes():
+    try:
+        since = int(request.args.get('since', 0))
+        limit = min(int(request.args.get('limit', 500)), 1000)
+    except ValueError:
+        return jsonify({"error": "since and limit must be integers"}), 400
+    
+    # Never past a seq that a still-running transaction could fill in
+    conditions = [Change.seq > since]
+    settled = settled_seq(db.session.connection())
+    if settled is not None:
+        conditions.append(Change.seq <= settled)
+    page = (Change.query
+            .filter(*conditions)
+            .order_by(Change.seq)
+            .limit(limit + 1)
+            .all())
+    has_more = len(page) > limit
+    page = page[:limit]
+    
+    # Only the newest change per row matters; the row's current state is sent
+    latest = {}
+    for change in page:
+        latest.pop((change.entity, change.entity_id), None)
+        latest[(change.entity, change.entity_id)] = change
+    
+    # One query per entity type for the rows that still exist
+    models = {'event': Event, 'category': Category, 'review': Review}
+    current = {}
+    for entity, model in models.items():
+        ids = [id for (name, id), c in latest.items() if name == entity and c.op != 'delete']
+        if ids:
+            for row in model.query.filter(model.id.in_(ids)).all():
+                current[(entity, row.id)] = row.to_dict()
+    
+    changes = []
+    for key, change in latest.items():
+        delta = change.to_dict()
+        if key in current:
+            delta['op'] = 'upsert'
+            delta['data'] = current[key]
+        else:
+            delta['op'] = 'delete'
+        changes.append(delta)
+    
+    return jsonify({
+        "changes": changes,
+        "next_since": page[-1].seq if page else since,
+        "has_more": has_more
+    })
+
+def _seat_stream_response(event_ids):
+    if not request.environ.get('wsgi.multithread'):
+        # A stream would block a single-threaded worker until the client leaves
+        return jsonify({"error": "Seat streams need a threaded or ASGI server"}), 503
+    seats = seats_remaining(event_ids)
+    # Every open stream holds a worker thread, so they are capped per worker
+    subscription = seat_publisher.subscribe(tuple(seats), limit=current_app.config['SSE_MAX_STREAMS'])
+    if subscription is None:
+        response = jsonify({"error": "Too many open seat streams, try again later"})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(current_app.config['SSE_HEARTBEAT_SECONDS'])
+        return response
+    # Release the pooled connection before holding the stream open
+    db.session.remove()
+    heartbeat = current_app.config['SSE_HEARTBEAT_SECONDS']
+    return Response(
+        sse_stream(subscription, seats, heartbeat),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+# GET live seat availability for one event (Server-Sent Events)
+@events_bp.route('/<int:id>/seats/stream', methods=['GET'])
+def stream_event_seats(id):
+    if not db.session.get(Event, id):
+        return jsonify({"error": "Event not found"}), 404
+    return _seat_stream_response([id])
+
+# GET live seat availability for several events: ?ids=1,2,3
+@events_bp.route('/seats/stream', methods=['GET'])
+def stream_seats():
+    try:
+        ids = {int(i) for i in request.args.get('ids', '').split(',') if i.strip()}
+    except ValueError:
+        return jsonify({"error": "ids must be a comma separated list of integers"}), 400
+    if not ids:
+        return jsonify({"error": "Missing ids"}), 400
+    if len(ids) > current_app.config['SSE_MAX_EVENTS']:
+        return jsonify({"error": f"At most {current_app.config['SSE_MAX_EVENTS']} events per stream"}), 400
+    return _seat_stream_response(list(ids))
+
+def _bucket_start(bucket):
+    """SQL expression for the first day of the day/week bucket an event falls in."""
+    if db.engine.dialect.name == 'postgresql':
+        return db.cast(db.func.date_trunc(bucket, Event.date), db.Date)
+    if bucket == 'week':
+        # Monday of the event's week
+        return db.func.date(Event.date, 'weekday 0', '-6 days')
+    return db.func.date(Event.date)
+
+def _supports_window_functions():
+    return db.engine.dialect.name != 'sqlite' or sqlite3.sqlite_version_info >= (3, 25, 0)
+
+# GET upcoming events similar to the caller's recent bookings (or to ?event_id=)
+@events_bp.route('/recommended', methods=['GET'])
+def get_recommended_events():
+    limit = min(request.args.get('limit', 10, type=int), 50)
+    seeds, affinity = [], {}
+    if request.args.get('event_id'):
+        try:
+            seeds = [int(request.args['event_id'])]
+        except ValueError:
+            return jsonify({"error": "event_id must be an integer"}), 400
+    else:
+        try:
+            logged_in = load_identity()
+        except InvalidToken as e:
+            return jsonify({"error": str(e)}), 401
+        if logged_in:
+            seeds = db.session.scalars(
+                db.select(Booking.event_id)
+                .where(Booking.user_id == g.user_id, Booking.status != 'cancelled')
+                .order_by(Booking.created_at.desc())
+                .limit(20)
+            ).all()
+            affinity = category_affinity(g.user_id)
+    if not seeds:
+        return jsonify([])
+    
+    # Precomputed neighbours of the seed events, looked up by primary key;
+    # for a logged-in caller, boosted by their share of each category
+    score = db.func.sum(EventRecommendation.score)
+    if affinity:
+        score = score * (1 + db.case(affinity, value=Event.category_id, else_=0))
+    score = score.label('score')
+    rows = db.session.execute(
+        db.select(Event, score)
+        .join(EventRecommendation, EventRecommendation.neighbor_id == Event.id)
+        .where(EventRecommendation.event_id.in_(seeds),
+               Event.id.not_in(seeds),
+               Event.date >= datetime.utcnow())
+        .group_by(Event.id)
+        .order_by(score.desc())
+        .limit(limit)
+    ).all()
+    result = [{**event.to_dict(), 'score': round(total, 4)} for event, total in rows]
+    
+    if affinity and len(result) < limit:
+        # Too few co-booked neighbours: fill up from the caller's favourite
+        # categories, scored by the category's share
+        share = db.case(affinity, value=Event.category_id, else_=0)
+        exclude = seeds + [event.id for event, _ in rows]
+        more = (Event.query
+                .filter(Event.category_id.in_(list(affinity)),
+                        Event.id.not_in(exclude),
+                        Event.date >= datetime.utcnow())
+                .order_by(share.desc(), Event.date)
+                .limit(limit - len(result))
+                .all())
+        result += [{**event.to_dict(), 'score': round(affinity[event.category_id], 4)} for event in more]
+    return jsonify(result)
+
+# GET upcoming events ranked by recent bookings and views
+@events_bp.route('/trending', methods=['GET'])
+def get_trending_events():
+    limit = min(request.args.get('limit', 10, type=int), 50)
+    ranked = top_event_ids(limit, Event.date >= datetime.utcnow())
+    events = {e.id: e for e in Event.query.filter(Event.id.in_([id for id, _ in ranked])).all()}
+    return jsonify([
+        {**events[id].to_dict(), 'trending_score': round(score, 4)}
+        for id, score in ranked if id in events
+    ])
+
+# GET view, ticket and revenue totals for the caller's events
+@events_bp.route('/my-events/stats', methods=['GET'])
+@login_required
+def get_my_event_stats():
+    sales = (db.select(Booking.event_id,
+                       db.func.sum(Booking.tickets_count).label('tickets'),
+                       db.func.sum(Booking.total_price).label('revenue'))
+             .where(Booking.status != 'cancelled')
+             .group_by(Booking.event_id)
+             .subquery())
+    rows = db.session.execute(
+        db.select(Event.id, Event.title, Event.date,
+                  EventView.view_count, EventView.last_viewed_at,
+                  sales.c.tickets, sales.c.revenue)
+        .outerjoin(EventView, EventView.event_id == Event.id)
+        .outerjoin(sales, sales.c.event_id == Event.id)
+        .where(Event.organizer_id == g.user_id)
+        .order_by(Event.date)
+    ).all()
+    
+    now = datetime.utcnow()
+    events = [{
+        'id': row.id,
+        'title': row.title,
+        'date': row.date.isoformat(),
+        'views': row.view_count or 0,
+        'last_viewed_at': row.last_viewed_at.isoformat() if row.last_viewed_at else None,
+        'tickets_sold': row.tickets or 0,
+        'revenue': row.revenue or 0,
+    } for row in rows]
+    return jsonify({
+        'total_events': len(rows),
+        'upcoming_events': sum(1 for row in rows if row.date >= now),
+        'total_tickets_sold': sum(e['tickets_sold'] for e in events),
+        'total_revenue': sum(e['revenue'] for e in events),
+        'total_views': sum(e['views'] for e in events),
+        'events': events,
+    })
+
+# GET per-day or per-week event counts plus the first events of each bucket
+@events_bp.route('/calendar', methods=['GET'])
+def get_calendar():
+    try:
+        start = datetime.strptime(request.args['from'], '%Y-%m-%d')
+        end = datetime.strptime(request.args['to'], '%Y-%m-%d') + timedelta(days=1)
+        per_bucket = min(int(request.args.get('per_bucket', 5)), 50)
+        category_id = request.args.get('category_id', type=int)
+        fields = parse_fields(request.args.get('fields'), Event)
+    except KeyError:
+        return jsonify({"error": "from and to are required (YYYY-MM-DD)"}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    bucket = request.args.get('bucket', 'day')
+    if bucket not in ('day', 'week'):
+        return jsonify({"error": "bucket must be day or week"}), 400
+    if not timedelta(0) < end - start <= timedelta(days=366):
+        return jsonify({"error": "from must not be after to, and the range is limited to a year"}), 400
+    
+    # (category_id, date) / (date) index range scan
+    conditions = [Event.date >= start, Event.date < end]
+    if category_id is not None:
+        conditions.append(Event.category_id == category_id)
+    bucket_start = _bucket_start(bucket)
+    
+    buckets = {}
+    if _supports_window_functions():
+        ranked = (db.select(
+                      Event.id,
+                      bucket_start.label('bucket'),
+                      db.func.row_number().over(partition_by=bucket_start,
+                                                order_by=(Event.date, Event.id)).label('rank'),
+                      db.func.count().over(partition_by=bucket_start).label('total'))
+                  .where(*conditions)
+                  .subquery())
+        rows = db.session.execute(
+            db.select(Event, ranked.c.bucket, ranked.c.total)
+            .join(ranked, ranked.c.id == Event.id)
+            .where(ranked.c.rank <= per_bucket)
+            .options(*fields_options(Event, fields))
+            .order_by(ranked.c.bucket, ranked.c.rank)
+        ).all()
+        for event, key, total in rows:
+            entry = buckets.setdefault(str(key), {'count': total, 'events': []})
+            entry['events'].append(event.to_dict(fields=fields))
+    else:
+        # Old SQLite: counts from a GROUP BY, first events picked while scanning in date order
+        counts = db.session.execute(
+            db.select(bucket_start, db.func.count()).where(*conditions).group_by(bucket_start)
+        ).all()
+        for key, total in counts:
+            buckets[str(key)] = {'count': total, 'events': []}
+        rows = db.session.execute(
+            db.select(Event, bucket_start)
+            .where(*conditions)
+            .options(*fields_options(Event, fields))
+            .order_by(Event.date, Event.id)
+        ).all()
+        for event, key in rows:
+            events = buckets[str(key)]['events']
+            if len(events) < per_bucket:
+                events.append(event.to_dict(fields=fields))
+    
+    return jsonify({
+        "bucket": bucket,
+        "buckets": [{"start": key, **buckets[key]} for key in sorted(buckets)]
+    })
+
+# GET events within radius km of a point, nearest first
+@events_bp.route('/nearby', methods=['GET'])
+def get_nearby_events():
+    try:
+        lat = float(request.args['lat'])
+        lng = float(request.args['lng'])
+        radius = float(request.args.get('radius', 10))
+        limit = min(int(request.args.get('limit', 50)), 200)
+    except (KeyError, ValueError):
+        return jsonify({"error": "lat and lng are required; radius (km) and limit must be numbers"}), 400
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180) or not 0 < radius <= 500:
+        return jsonify({"error": "Coordinates out of range or radius not within (0, 500] km"}), 400
+    
+    # Candidates: index range scans over the covering geohash cells
+    cells = []
+    for prefix in covering_prefixes(lat, lng, radius):
+        upper = prefix_upper_bound(prefix)
+        cells.append(Event.geohash >= prefix if upper is None
+                     else db.and_(Event.geohash >= prefix, Event.geohash < upper))
+    candidates = db.session.execute(
+        db.select(Event.id, Event.latitude, Event.longitude).where(db.or_(*cells))
+    ).all()
+    if not candidates:
+        return jsonify([])
+    
+    # Exact distances for the whole candidate set at once
+    distances = haversine_km(lat, lng, [c.latitude for c in candidates], [c.longitude for c in candidates])
+    nearest = sorted((d, c.id) for d, c in zip(distances, candidates) if d <= radius)[:limit]
+    
+    events = {e.id: e for e in Event.query.filter(Event.id.in_([id for _, id in nearest])).all()}
+    return jsonify([
+        {**events[id].to_dict(), 'distance_km': round(distance, 3)}
+        for distance, id in nearest if id in events
+    ])
 
 # GET single event
 @events_bp.route('/<int:id>', methods=['GET'])
 def get_event(id):
-    event = Event.query.get_or_404(id)
-    return jsonify(event.to_dict())
+    try:
+        fields = parse_fields(request.args.get('fields'), Event)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    def load():
+        # version is loaded even when not requested; it is the ETag
+        event = (Event.query
+                 .options(*fields_options(Event, fields and fields + ('version',)))
+                 .filter_by(id=id)
+                 .first())
+        if event is None:
+            return None
+        return PrecompressedBody(jsonify(event.to_dict(fields=fields)).get_data()), event.version
+    
+    cached = event_cache.get((id, fields), load)
+    if cached is None:
+        if parse_flag(request.args.get('include_archived')):
+            archived = ArchivedEvent.query.options(*fields_options(ArchivedEvent, fields)).filter_by(id=id).first()
+            if archived:
+                return jsonify(archived.to_dict(fields=fields))
+        abort(404)
+    body, version = cached
+    view_counter.add(id)
+    response = precompressed_response(current_app, body)
+    response.set_etag(str(version))
+    return response
 
 # CREATE event
 @events_bp.route('/', methods=['POST'])
@@ -28,15 +444,17 @@ def create_event():
         return jsonify({"error": "Missing required fields: title, location, date"}), 400
     
     # Parse date
-    date_str = data['date']
     try:
-        if 'T' in date_str:
-            event_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-        else:
-            event_date = datetime.strptime(date_str, '%Y-%m-%d')
+        event_date = parse_event_date(data['date'])
     except ValueError:
         return jsonify({"error": "Invalid date format. Use YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS"}), 400
     
+    try:
+        latitude, longitude = parse_coordinates(data)
+        category_id = parse_category_id(data.get('category_id'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
     # Create event
     event = Event(
         title=data['title'],
@@ -45,8 +463,10 @@ def create_event():
         location=data['location'],
         price=float(data.get('price', 0)),
         capacity=int(data.get('capacity', 100)),
-        organizer_id=session['user_id'],
-        category_id=data.get('category_id')
+        organizer_id=g.user_id,
+        category_id=category_id,
+        latitude=latitude,
+        longitude=longitude
     )
     
     db.session.add(event)
@@ -54,6 +474,110 @@ def create_event():
     
     return jsonify(event.to_dict()), 201
 
+def event_row(data, organizer_id):
+    """Validate one imported event and return its column values.
+
+    Raises ValueError describing the first problem. Empty strings (blank
+    CSV cells) count as missing.
+    """
+    data = {key: value for key, value in data.items() if value not in ('', None)}
+    missing = [name for name in ('title', 'location', 'date') if name not in data]
+    if missing:
+        raise ValueError(f"Missing required fields: {', '.join(missing)}")
+    try:
+        date = parse_event_date(data['date'])
+    except ValueError:
+        raise ValueError("Invalid date format. Use YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS")
+    try:
+        price = float(data.get('price', 0))
+        capacity = int(data.get('capacity', 100))
+    except (TypeError, ValueError):
+        raise ValueError("price and capacity must be numbers")
+    latitude, longitude = parse_coordinates(data)
+    return {
+        'title': data['title'],
+        'description': data.get('description', ''),
+        'date': date,
+        'location': data['location'],
+        'price': price,
+        'capacity': capacity,
+        'organizer_id': organizer_id,
+        'category_id': parse_category_id(data.get('category_id')),
+        'latitude': latitude,
+        'longitude': longitude,
+        # Core inserts skip the ORM hook that normally sets this
+        'geohash': geohash_encode(latitude, longitude) if latitude is not None else None,
+    }
+
+def import_rows():
+    """Yield event dicts from a JSON array, NDJSON or CSV request body.
+    NDJSON and CSV are read line by line rather than all at once; an NDJSON
+    line that doesn't parse is yielded as its ValueError so only that row
+    fails."""
+    mimetype = request.mimetype
+    if mimetype == 'text/csv':
+        stream = io.TextIOWrapper(io.BufferedReader(request.stream), encoding='utf-8-sig', newline='')
+        yield from csv.DictReader(stream)
+    elif mimetype in ('application/x-ndjson', 'application/jsonl'):
+        for line in io.BufferedReader(request.stream):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                row = ValueError(f"Invalid JSON: {e}")
+            yield row
+    else:
+        rows = request.get_json()
+        if not isinstance(rows, list):
+            raise ValueError("Expected a JSON array of events")
+        yield from rows
+
+# CREATE events in bulk (JSON array, NDJSON or CSV)
+@events_bp.route('/bulk', methods=['POST'])
+@login_required
+def bulk_create_events():
+    max_rows = current_app.config['BULK_IMPORT_MAX_ROWS']
+    chunk_size = current_app.config['BULK_IMPORT_CHUNK_SIZE']
+    table = Event.__table__
+    created, errors, chunk = [], [], []
+    
+    def insert_chunk():
+        # One multi-row INSERT per chunk; all chunks commit together below
+        ids = db.session.scalars(table.insert().returning(table.c.id), chunk).all()
+        record_changes(db.session.connection(), 'event', ids, 'insert')
+        created.extend(ids)
+        chunk.clear()
+    
+    try:
+        for number, data in enumerate(import_rows(), start=1):
+            if number > max_rows:
+                db.session.rollback()
+                return jsonify({"error": f"At most {max_rows} events per import"}), 413
+            try:
+                if isinstance(data, ValueError):
+                    raise data
+                if not isinstance(data, dict):
+                    raise ValueError("Expected an object")
+                chunk.append(event_row(data, g.user_id))
+            except ValueError as e:
+                errors.append({"row": number, "error": str(e)})
+                continue
+            if len(chunk) >= chunk_size:
+                insert_chunk()
+        if chunk:
+            insert_chunk()
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        db.session.rollback()
+        return jsonify({"error": f"Could not read import: {e}"}), 400
+    
+    db.session.commit()
+    return jsonify({
+        "created": len(created),
+        "ids": created,
+        "errors": errors
+    }), 201 if created else 400
+
 # UPDATE event
 @events_bp.route('/<int:id>', methods=['PUT'])
 @login_required
@@ -61,11 +585,10 @@ def update_event(id):
     event = Event.query.get_or_404(id)
     
     # Check authorization
-    if event.organizer_id != session['user_id']:
-        from models import User
-        user = User.query.get(session['user_id'])
-        if not user or not user.is_admin():
-            return jsonify({"error": "Unauthorized"}), 403
+    if event.organizer_id != g.user_id and not current_user_is_admin():
+        return jsonify({"error": "Unauthorized"}), 403
+    if if_match_failed(event.version):
+        return precondition_failed(event, 'event')
     
     data = request.get_json()
     
@@ -81,19 +604,168 @@ def update_event(id):
     if 'capacity' in data:
         event.capacity = int(data['capacity'])
     if 'category_id' in data:
-        event.category_id = data['category_id']
+        try:
+            event.category_id = parse_category_id(data['category_id'])
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+    if 'latitude' in data or 'longitude' in data:
+        try:
+            event.latitude, event.longitude = parse_coordinates(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
     if 'date' in data:
         try:
-            date_str = data['date']
-            if 'T' in date_str:
-                event.date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-            else:
-                event.date = datetime.strptime(date_str, '%Y-%m-%d')
+            event.date = parse_event_date(data['date'])
         except ValueError:
             return jsonify({"error": "Invalid date format"}), 400
     
+    conflict = commit_or_conflict(event, 'event')
+    if conflict:
+        return conflict
+    invalidate_event_cache(id)
+    response = jsonify(event.to_dict())
+    response.set_etag(str(event.version))
+    return response
+
+def event_updates(data):
+    """Validate the fields present in a PATCH body and return the column
+    values to set. Raises ValueError; unknown keys are ignored."""
+    values = {}
+    for name in ('title', 'location'):
+        if name in data:
+            if not data[name]:
+                raise ValueError(f"{name} can't be empty")
+            values[name] = data[name]
+    if 'description' in data:
+        values['description'] = data['description']
+    try:
+        if 'price' in data:
+            values['price'] = float(data['price'])
+        if 'capacity' in data:
+            values['capacity'] = int(data['capacity'])
+    except (TypeError, ValueError):
+        raise ValueError("price and capacity must be numbers")
+    if 'category_id' in data:
+        values['category_id'] = parse_category_id(data['category_id'])
+    if 'latitude' in data or 'longitude' in data:
+        latitude, longitude = parse_coordinates(data)
+        values['latitude'], values['longitude'] = latitude, longitude
+        # Core updates skip the ORM hook that normally sets this
+        values['geohash'] = geohash_encode(latitude, longitude) if latitude is not None else None
+    if 'date' in data:
+        try:
+            values['date'] = parse_event_date(data['date'])
+        except ValueError:
+            raise ValueError("Invalid date format. Use YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS")
+    return values
+
+# PATCH event: one UPDATE of the supplied fields, without loading the row.
+# With If-Match, or "version" in the body, the update only applies if the
+# event is still at that version.
+@events_bp.route('/<int:id>', methods=['PATCH'])
+@login_required
+def patch_event(id):
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
+    try:
+        values = event_updates(data)
+        expected = int(data['version']) if data.get('version') is not None else None
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    if not values:
+        return jsonify({"error": "No fields to update"}), 400
+    
+    table = Event.__table__
+    conditions = [table.c.id == id, table.c.deleted_at.is_(None)]
+    if not current_user_is_admin():
+        conditions.append(table.c.organizer_id == g.user_id)
+    if expected is not None:
+        conditions.append(table.c.version == expected)
+    if request.if_match and not request.if_match.star_tag:
+        versions = [int(tag) for tag in request.if_match.as_set() if tag.isdigit()]
+        conditions.append(table.c.version.in_(versions))
+    row = db.session.execute(
+        table.update()
+        .where(*conditions)
+        .values(**values, version=table.c.version + 1)
+        .returning(*[table.c[name] for name in Event.serializable_fields])
+    ).first()
+    
+    if row is None:
+        # Nothing matched; load the row only now to say why
+        db.session.rollback()
+        event = Event.query.get_or_404(id)
+        if event.organizer_id != g.user_id and not current_user_is_admin():
+            return jsonify({"error": "Unauthorized"}), 403
+        if if_match_failed(event.version):
+            return precondition_failed(event, 'event')
+        return current_state(event, 'event', f"This event has changed; it is now at version {event.version}", 409)
+    
+    record_changes(db.session.connection(), 'event', [id], 'update')
     db.session.commit()
-    return jsonify(event.to_dict())
+    invalidate_event_cache(id)
+    response = jsonify({name: value.isoformat() if isinstance(value, datetime) else value
+                        for name, value in row._mapping.items()})
+    response.set_etag(str(row.version))
+    return response
+
+def event_filter_conditions(filters):
+    """WHERE conditions for a bulk PATCH filter; raises ValueError."""
+    table = Event.__table__
+    conditions = [table.c.deleted_at.is_(None)]
+    if 'ids' in filters:
+        ids = filters['ids']
+        if not isinstance(ids, list) or not ids:
+            raise ValueError("ids must be a non-empty list")
+        conditions.append(table.c.id.in_([int(id) for id in ids]))
+    if 'category_id' in filters:
+        category_id = filters['category_id']
+        conditions.append(table.c.category_id.is_(None) if category_id is None
+                          else table.c.category_id == int(category_id))
+    if 'organizer_id' in filters:
+        conditions.append(table.c.organizer_id == int(filters['organizer_id']))
+    if 'from' in filters:
+        conditions.append(table.c.date >= parse_event_date(filters['from']))
+    if 'to' in filters:
+        conditions.append(table.c.date < parse_event_date(filters['to']))
+    if len(conditions) == 1:
+        raise ValueError("filter needs at least one of: ids, category_id, organizer_id, from, to")
+    return conditions
+
+# PATCH every event matching a filter in one UPDATE, e.g. reprice a category:
+# {"filter": {"category_id": 3}, "set": {"price": 25}}. Organizers only
+# reach their own events.
+@events_bp.route('/', methods=['PATCH'])
+@login_required
+def bulk_update_events():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('filter'), dict) \
+            or not isinstance(data.get('set'), dict):
+        return jsonify({"error": "Expected an object with filter and set"}), 400
+    try:
+        conditions = event_filter_conditions(data['filter'])
+        values = event_updates(data['set'])
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    if not values:
+        return jsonify({"error": "No fields to update"}), 400
+    
+    table = Event.__table__
+    if not current_user_is_admin():
+        conditions.append(table.c.organizer_id == g.user_id)
+    ids = db.session.scalars(
+        table.update()
+        .where(*conditions)
+        .values(**values, version=table.c.version + 1)
+        .returning(table.c.id)
+    ).all()
+    record_changes(db.session.connection(), 'event', ids, 'update')
+    db.session.commit()
+    
+    updated = set(ids)
+    event_cache.invalidate(lambda key: key[0] in updated)
+    return jsonify({"updated": len(ids), "ids": ids})
 
 # DELETE event
 @events_bp.route('/<int:id>', methods=['DELETE'])
@@ -102,12 +774,15 @@ def delete_event(id):
     event = Event.query.get_or_404(id)
     
     # Check authorization
-    if event.organizer_id != session['user_id']:
-        from models import User
-        user = User.query.get(session['user_id'])
-        if not user or not user.is_admin():
-            return jsonify({"error": "Unauthorized"}), 403
+    if event.organizer_id != g.user_id and not current_user_is_admin():
+        return jsonify({"error": "Unauthorized"}), 403
+    if if_match_failed(event.version):
+        return precondition_failed(event, 'event')
     
-    db.session.delete(event)
-    db.session.commit()
+    # Hidden right away; bookings and reviews are purged in the background
+    event.deleted_at = datetime.utcnow()
+    conflict = commit_or_conflict(event, 'event')
+    if conflict:
+        return conflict
+    invalidate_event_cache(id)
     return jsonify({"message": "Event deleted successfully"})
\ No newline at end of file
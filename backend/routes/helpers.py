@@ -0,0 +1,97 @@
+from flask import jsonify, request
+from sqlalchemy.orm import joinedload, load_only
+from sqlalchemy.orm.exc import ObjectDeletedError, StaleDataError
+from models import db, Event
+
+
+def parse_expand(value, model):
+    """Parse a comma separated ``?expand=`` value against ``model.expandable``.
+
+    Raises ValueError naming any relationship that can't be expanded.
+    """
+    names = [name.strip() for name in (value or '').split(',') if name.strip()]
+    unknown = [name for name in names if name not in model.expandable]
+    if unknown:
+        raise ValueError(
+            f"Cannot expand: {', '.join(unknown)}. "
+            f"Allowed: {', '.join(model.expandable)}"
+        )
+    return tuple(dict.fromkeys(names))
+
+
+def parse_flag(value):
+    """True for ``?flag=1`` style query values (1, true, yes)."""
+    return (value or '').lower() in ('1', 'true', 'yes')
+
+
+def expand_options(model, expand):
+    # Every expandable relationship is many-to-one, so a joined eager load
+    # fetches the whole list in a single query.
+    return [joinedload(getattr(model, name)) for name in expand]
+
+
+def parse_fields(value, model):
+    """Parse a comma separated ``?fields=`` value against ``model.serializable_fields``.
+
+    Returns None when no fields were requested. ``id`` is always included.
+    """
+    names = [name.strip() for name in (value or '').split(',') if name.strip()]
+    if not names:
+        return None
+    unknown = [name for name in names if name not in model.serializable_fields]
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(unknown)}. "
+            f"Allowed: {', '.join(model.serializable_fields)}"
+        )
+    return tuple(dict.fromkeys(['id'] + names))
+
+
+def fields_options(model, fields):
+    # Restrict the SELECT to the requested columns; unrequested ones stay
+    # deferred and to_dict(fields=...) never touches them.
+    if not fields:
+        return []
+    return [load_only(*[getattr(model, name) for name in fields])]
+
+
+def event_is_live(event_id):
+    """True when the event exists and isn't soft-deleted. Checked explicitly
+    because the foreign key alone accepts soft-deleted events."""
+    return db.session.scalar(
+        db.select(Event.id).where(Event.id == event_id, Event.deleted_at.is_(None))
+    ) is not None
+
+
+def if_match_failed(version):
+    """True when the request has an If-Match header that doesn't list the
+    ETag for ``version`` (ETags are the row's version number)."""
+    if_match = request.if_match
+    return bool(if_match) and not if_match.contains(str(version))
+
+
+def current_state(obj, name, message, status):
+    """Error response carrying ``obj``'s current representation and ETag,
+    so the client can retry against it."""
+    response = jsonify({"error": message, name: obj.to_dict()})
+    response.set_etag(str(obj.version))
+    return response, status
+
+
+def precondition_failed(obj, name):
+    return current_state(obj, name, f"This {name} has changed; If-Match doesn't match", 412)
+
+
+def commit_or_conflict(obj, name):
+    """Commit the session. If another request updated ``obj`` after it was
+    loaded, roll back and return a 409 response with its current state;
+    otherwise return None."""
+    try:
+        db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        try:
+            return current_state(obj, name, f"This {name} was changed by another request", 409)
+        except ObjectDeletedError:
+            return jsonify({"error": f"This {name} was deleted by another request"}), 404
+    return None
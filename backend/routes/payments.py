@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify, session
-from models import db, Booking
+from models import Booking
 from routes.auth import login_required
+from routes.helpers import if_match_failed, precondition_failed, commit_or_conflict
 
 payments_bp = Blueprint('payments', __name__)
 
@@ -11,10 +12,14 @@ def process_payment():
     booking_id = data.get('booking_id')
     
     booking = Booking.query.get_or_404(booking_id)
+    if if_match_failed(booking.version):
+        return precondition_failed(booking, 'booking')
     
     # Mock payment processing
     booking.status = 'confirmed'
-    db.session.commit()
+    conflict = commit_or_conflict(booking, 'booking')
+    if conflict:
+        return conflict
     
     return jsonify({
         "message": "Payment successful",
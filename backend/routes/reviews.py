@@ -1,6 +1,8 @@
-from flask import Blueprint, request, jsonify, session
-from models import db, Review
+from flask import Blueprint, g, request, jsonify
+from sqlalchemy.exc import IntegrityError
+from models import db, Review, ArchivedReview
 from routes.auth import login_required
+from routes.helpers import parse_expand, expand_options, parse_flag, event_is_live
 
 reviews_bp = Blueprint('reviews', __name__)
 
@@ -9,18 +11,44 @@ reviews_bp = Blueprint('reviews', __name__)
 def create_review():
     data = request.get_json()
     
+    if not data.get('event_id') or data.get('rating') is None:
+        return jsonify({"error": "event_id and rating are required"}), 400
+    if not event_is_live(data['event_id']):
+        return jsonify({"error": "Event not found"}), 404
+    
     review = Review(
-        user_id=session['user_id'],
+        user_id=g.user_id,
         event_id=data['event_id'],
         rating=data['rating'],
         comment=data.get('comment', '')
     )
     
     db.session.add(review)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        # The unique constraint, or the event vanished after the check above
+        if not Review.query.filter_by(user_id=g.user_id, event_id=data['event_id']).first():
+            return jsonify({"error": "Event not found"}), 404
+        return jsonify({"error": "You have already reviewed this event"}), 409
     return jsonify(review.to_dict()), 201
 
 @reviews_bp.route('/event/<int:event_id>', methods=['GET'])
 def get_event_reviews(event_id):
-    reviews = Review.query.filter_by(event_id=event_id).all()
-    return jsonify([r.to_dict() for r in reviews])
\ No newline at end of file
+    include_archived = parse_flag(request.args.get('include_archived'))
+    try:
+        expand = parse_expand(request.args.get('expand'), Review)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if expand and include_archived:
+        return jsonify({"error": "expand can't be combined with include_archived"}), 400
+    
+    reviews = (Review.query
+               .options(*expand_options(Review, expand))
+               .filter_by(event_id=event_id)
+               .all())
+    result = [r.to_dict(expand=expand) for r in reviews]
+    if include_archived:
+        result += [r.to_dict() for r in ArchivedReview.query.filter_by(event_id=event_id).all()]
+    return jsonify(result)
\ No newline at end of file
@@ -9,8 +9,18 @@ if backend_dir not in sys.path:
 from flask import Flask, jsonify
 from flask_migrate import Migrate
 from flask_cors import CORS
+from sqlalchemy import event as sa_event
+from werkzeug.middleware.proxy_fix import ProxyFix
 from models import db
 from server.config import Config
+from server.compression import init_compression
+from server.commands import register_commands
+from server.availability import seat_publisher
+from server.sessions import init_sessions
+from server.ratelimit import init_rate_limits
+from server.views import view_counter
+from server.partitions import ensure_future_partitions
+from server.catalog import category_catalog
 
 # Import blueprints
 from routes.auth import auth_bp
@@ -21,24 +31,60 @@ from routes.categories import categories_bp
 from routes.payments import payments_bp
 from routes.admin import admin_bp
 
+def enable_sqlite_foreign_keys(engine):
+    """SQLite only enforces foreign keys (and ON DELETE CASCADE) when asked
+    to on each connection."""
+    if engine.dialect.name != 'sqlite':
+        return
+    
+    @sa_event.listens_for(engine, 'connect')
+    def set_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    if app.config['TRUST_PROXY_HOPS']:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUST_PROXY_HOPS'])
     
     # Enable CORS
-    frontend_url = os.environ.get('FRONTEND_URL', 'http://localhost:5173')
     CORS(app, 
-         origins=[frontend_url, 'http://localhost:5173', 'http://localhost:3000'],
+         origins=app.config['CORS_ORIGINS'],
+         expose_headers=['X-CSRF-Token'],
          supports_credentials=True)
     
     # Initialize extensions
     db.init_app(app)
     Migrate(app, db)
+    init_compression(app)
+    register_commands(app)
+    seat_publisher.init_app(app)
+    init_sessions(app)
+    init_rate_limits(app)
+    view_counter.init_app(app, app.config['VIEW_FLUSH_SECONDS'])
     
     # Create tables on startup
     with app.app_context():
+        enable_sqlite_foreign_keys(db.engine)
         db.create_all()
+        # Bookings still land in bookings_default without the partitions, so
+        # a failure here shouldn't keep the app from starting
+        try:
+            with db.engine.begin() as conn:
+                ensure_future_partitions(conn, app.config['BOOKING_PARTITION_MONTHS_AHEAD'])
+        except Exception:
+            app.logger.exception("Creating booking partitions failed")
         print("✅ Database tables created/verified")
+        
+        # Connections pooled before a fork (e.g. gunicorn preload_app) must not
+        # be shared with the child; drop them there without closing the parent's
+        engine = db.engine
+        os.register_at_fork(after_in_child=lambda: engine.dispose(close=False))
+    
+    # Load the category snapshot before workers fork
+    category_catalog.init_app(app)
     
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
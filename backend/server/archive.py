@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+from models import db, Event, Booking, Review
+from models.archive import ARCHIVES
+from models.change import record_changes
+
+
+def _move(model, ids):
+    """Copy rows to the model's archive table and delete them, in the
+    current transaction."""
+    table, archive = model.__table__, ARCHIVES[model].__table__
+    columns = [column.name for column in table.columns]
+    db.session.execute(
+        archive.insert().from_select(columns, db.select(*table.columns).where(table.c.id.in_(ids)))
+    )
+    db.session.execute(table.delete().where(table.c.id.in_(ids)))
+
+
+def archive_past_events(days, batch_size=1000):
+    """Move events that took place more than ``days`` ago, with their bookings
+    and reviews, into the archive tables.
+
+    Works through ``batch_size`` events at a time; children are moved in
+    batches of the same size, each in its own transaction, before their
+    events. Soft-deleted events are left for purge-events. Returns the
+    number of events archived.
+    """
+    before = datetime.utcnow() - timedelta(days=days)
+    archived = 0
+    while True:
+        event_ids = db.session.scalars(
+            db.select(Event.id).where(Event.date < before).order_by(Event.id).limit(batch_size)
+        ).all()
+        if not event_ids:
+            return archived
+        for model, entity in ((Booking, None), (Review, 'review')):
+            while True:
+                ids = db.session.scalars(
+                    db.select(model.id).where(model.event_id.in_(event_ids)).limit(batch_size)
+                ).all()
+                if not ids:
+                    break
+                _move(model, ids)
+                if entity:
+                    record_changes(db.session.connection(), entity, ids, 'delete')
+                db.session.commit()
+        # Views, trending and recommendation rows cascade in the database
+        _move(Event, event_ids)
+        record_changes(db.session.connection(), 'event', event_ids, 'delete')
+        db.session.commit()
+        archived += len(event_ids)
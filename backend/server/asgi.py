@@ -0,0 +1,229 @@
+"""ASGI entry point.
+
+Read-only catalog endpoints are served natively with async SQLAlchemy
+sessions, so a slow database doesn't tie up a worker, and so are the seat
+streams, so an idle subscriber holds no thread; every other request is
+handed to the regular Flask app through a2wsgi, each on its own thread
+from a pool of ASGI_WSGI_THREADS. Select it at deploy time instead of the
+WSGI app, e.g.::
+
+    uvicorn server.asgi:app --host 0.0.0.0 --port $PORT
+
+Needs the packages in requirements-async.txt.
+"""
+import asyncio
+import json
+import os
+import re
+import sys
+from urllib.parse import parse_qs
+
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from a2wsgi import WSGIMiddleware
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from werkzeug.http import parse_accept_header
+from werkzeug.datastructures import Accept
+from models import Event, Review
+from routes.helpers import parse_expand, expand_options, parse_fields, fields_options, parse_flag
+from server.app import create_app, enable_sqlite_foreign_keys
+from server.availability import AsyncSubscription, seat_publisher, seats_statement, sse_message
+from server.compression import negotiate_encoding, compress
+from server.views import view_counter
+
+# Sync driver -> async driver
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgres': 'postgresql+asyncpg',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+
+def async_database_uri(uri):
+    scheme, rest = uri.split('://', 1)
+    return f"{ASYNC_DRIVERS.get(scheme.split('+')[0], scheme)}://{rest}"
+
+
+class NotFound(Exception):
+    pass
+
+
+async def list_events(session, params):
+    expand = parse_expand(params.get('expand'), Event)
+    fields = parse_fields(params.get('fields'), Event)
+    stmt = select(Event).options(*fields_options(Event, fields), *expand_options(Event, expand))
+    events = (await session.execute(stmt)).unique().scalars().all()
+    return [event.to_dict(fields=fields, expand=expand) for event in events]
+
+
+async def get_event(session, params, id):
+    fields = parse_fields(params.get('fields'), Event)
+    # version is loaded even when not requested; it is the ETag
+    stmt = (select(Event)
+            .options(*fields_options(Event, fields and fields + ('version',)))
+            .where(Event.id == id))
+    event = (await session.execute(stmt)).scalar_one_or_none()
+    if event is None:
+        raise NotFound()
+    view_counter.add(id)
+    return event.to_dict(fields=fields), str(event.version)
+
+
+async def list_event_reviews(session, params, event_id):
+    expand = parse_expand(params.get('expand'), Review)
+    stmt = (select(Review)
+            .options(*expand_options(Review, expand))
+            .where(Review.event_id == event_id))
+    reviews = (await session.execute(stmt)).unique().scalars().all()
+    return [r.to_dict(expand=expand) for r in reviews]
+
+
+# (pattern, handler) for GET requests served without Flask. Handlers return
+# the JSON data, or (data, etag).
+ROUTES = [
+    (re.compile(r'^/api/events/$'), list_events),
+    (re.compile(r'^/api/events/(\d+)$'), get_event),
+    (re.compile(r'^/api/reviews/event/(\d+)$'), list_event_reviews),
+]
+
+
+# Seat streams (Server-Sent Events); the pattern yields the single event id
+STREAM_ROUTES = [
+    re.compile(r'^/api/events/(\d+)/seats/stream$'),
+    re.compile(r'^/api/events/seats/stream$'),
+]
+
+
+def stream_event_ids(params, match, max_events):
+    """Event ids a stream request asks for; raises ValueError like the
+    Flask routes' 400s."""
+    if match.groups():
+        return [int(match.group(1))]
+    try:
+        ids = {int(i) for i in params.get('ids', '').split(',') if i.strip()}
+    except ValueError:
+        raise ValueError("ids must be a comma separated list of integers")
+    if not ids:
+        raise ValueError("Missing ids")
+    if len(ids) > max_events:
+        raise ValueError(f"At most {max_events} events per stream")
+    return list(ids)
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+def create_asgi_app():
+    flask_app = create_app()
+    # Not asgiref's WsgiToAsgi: it runs every request on one shared thread
+    wsgi = WSGIMiddleware(flask_app, workers=flask_app.config['ASGI_WSGI_THREADS'])
+    engine = create_async_engine(async_database_uri(flask_app.config['SQLALCHEMY_DATABASE_URI']))
+    enable_sqlite_foreign_keys(engine.sync_engine)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+
+    def cors_headers(request_headers):
+        # Same CORS policy Flask-CORS applies to the Flask routes
+        origin = request_headers.get(b'origin', b'').decode('latin-1')
+        if origin in flask_app.config['CORS_ORIGINS']:
+            return [(b'access-control-allow-origin', origin.encode('latin-1')),
+                    (b'access-control-allow-credentials', b'true')]
+        return []
+
+    async def send_json(scope, send, data, status=200, etag=None):
+        body = json.dumps(data, sort_keys=True, separators=(',', ':')).encode() + b'\n'
+        request_headers = dict(scope['headers'])
+        headers = [(b'content-type', b'application/json'), (b'vary', b'Origin, Accept-Encoding')]
+        if etag is not None:
+            headers.append((b'etag', f'"{etag}"'.encode()))
+        headers += cors_headers(request_headers)
+        if flask_app.config['COMPRESS_ENABLED'] and len(body) >= flask_app.config['COMPRESS_MIN_SIZE']:
+            accept = request_headers.get(b'accept-encoding', b'').decode('latin-1')
+            encoding = negotiate_encoding(parse_accept_header(accept, Accept))
+            if encoding:
+                body = compress(body, encoding, flask_app.config['COMPRESS_LEVELS'][encoding])
+                headers.append((b'content-encoding', encoding.encode()))
+        headers.append((b'content-length', str(len(body)).encode()))
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def send_seat_stream(scope, receive, send, event_ids, single):
+        async with Session() as session:
+            seats = dict((await session.execute(seats_statement(event_ids))).all())
+        if single and not seats:
+            return await send_json(scope, send, {"error": "Event not found"}, 404)
+        subscription = seat_publisher.subscribe(tuple(seats), limit=flask_app.config['SSE_MAX_ASYNC_STREAMS'],
+                                                subscription_class=AsyncSubscription)
+        if subscription is None:
+            return await send_json(scope, send, {"error": "Too many open seat streams, try again later"}, 503)
+        headers = [(b'content-type', b'text/event-stream'), (b'cache-control', b'no-cache'),
+                   (b'x-accel-buffering', b'no'), *cors_headers(dict(scope['headers']))]
+        heartbeat = flask_app.config['SSE_HEARTBEAT_SECONDS']
+        disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+        try:
+            await send({'type': 'http.response.start', 'status': 200, 'headers': headers})
+            while True:
+                await send({'type': 'http.response.body', 'body': sse_message(seats).encode(), 'more_body': True})
+                update = asyncio.ensure_future(subscription.wait_async(heartbeat))
+                await asyncio.wait([update, disconnected], return_when=asyncio.FIRST_COMPLETED)
+                if disconnected.done():
+                    update.cancel()
+                    return
+                seats = update.result()
+        finally:
+            disconnected.cancel()
+            seat_publisher.unsubscribe(subscription)
+
+    async def lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def app(scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await lifespan(receive, send)
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            for pattern in STREAM_ROUTES:
+                match = pattern.match(scope['path'])
+                if not match:
+                    continue
+                query = parse_qs(scope['query_string'].decode('latin-1'))
+                params = {key: values[-1] for key, values in query.items()}
+                try:
+                    event_ids = stream_event_ids(params, match, flask_app.config['SSE_MAX_EVENTS'])
+                except ValueError as e:
+                    return await send_json(scope, send, {"error": str(e)}, 400)
+                return await send_seat_stream(scope, receive, send, event_ids, single=bool(match.groups()))
+            for pattern, handler in ROUTES:
+                match = pattern.match(scope['path'])
+                if not match:
+                    continue
+                query = parse_qs(scope['query_string'].decode('latin-1'))
+                params = {key: values[-1] for key, values in query.items()}
+                if parse_flag(params.get('include_archived')):
+                    break  # archive lookups are left to the Flask routes
+                args = [int(arg) for arg in match.groups()]
+                try:
+                    async with Session() as session:
+                        data = await handler(session, params, *args)
+                except ValueError as e:
+                    return await send_json(scope, send, {"error": str(e)}, 400)
+                except NotFound:
+                    return await send_json(scope, send, {"error": "Not found"}, 404)
+                data, etag = data if isinstance(data, tuple) else (data, None)
+                return await send_json(scope, send, data, etag=etag)
+        return await wsgi(scope, receive, send)
+
+    return app
+
+
+app = create_asgi_app()
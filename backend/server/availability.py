@@ -0,0 +1,303 @@
+import asyncio
+import json
+import os
+import select
+import socket
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from sqlalchemy import and_, text
+from models import db, Event, Booking
+
+NOTIFY_CHANNEL = 'seat_changes'
+RECONNECT_SECONDS = 5
+
+
+def seats_statement(event_ids):
+    """(event_id, seats left) for the given events, as one query."""
+    booked = db.func.coalesce(db.func.sum(Booking.tickets_count), 0)
+    return (db.select(Event.id, Event.capacity - booked)
+            .outerjoin(Booking, and_(Booking.event_id == Event.id,
+                                     Booking.status != 'cancelled'))
+            .where(Event.id.in_(event_ids))
+            .group_by(Event.id, Event.capacity))
+
+
+def seats_remaining(event_ids):
+    """Return {event_id: seats left} for the given events in one query."""
+    return {event_id: seats for event_id, seats in db.session.execute(seats_statement(event_ids))}
+
+
+class Subscription:
+    """One SSE client. Updates that arrive faster than the client reads are
+    merged so only the latest count per event is sent."""
+
+    def __init__(self, event_ids):
+        self.event_ids = event_ids
+        self._pending = {}
+        self._ready = threading.Condition()
+
+    def push(self, seats):
+        with self._ready:
+            self._pending.update(seats)
+            self._ready.notify()
+
+    def wait(self, timeout):
+        with self._ready:
+            if not self._pending:
+                self._ready.wait(timeout)
+            seats, self._pending = self._pending, {}
+            return seats
+
+
+class AsyncSubscription(Subscription):
+    """A subscription read from an asyncio event loop (server/asgi.py), so
+    an idle client holds no thread."""
+
+    def __init__(self, event_ids):
+        super().__init__(event_ids)
+        self._loop = asyncio.get_running_loop()
+        self._updated = asyncio.Event()
+
+    def push(self, seats):
+        with self._ready:
+            self._pending.update(seats)
+        try:
+            self._loop.call_soon_threadsafe(self._updated.set)
+        except RuntimeError:
+            pass  # loop already closed
+
+    async def wait_async(self, timeout):
+        try:
+            await asyncio.wait_for(self._updated.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._updated.clear()
+        with self._ready:
+            seats, self._pending = self._pending, {}
+            return seats
+
+
+class PostgresChannel:
+    """Cross-worker notifications over PostgreSQL LISTEN/NOTIFY."""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def send(self, event_id):
+        with self.engine.connect() as conn:
+            conn.execute(text("SELECT pg_notify(:channel, :payload)"),
+                         {'channel': NOTIFY_CHANNEL, 'payload': str(event_id)})
+            conn.commit()
+
+    def listen(self, callback, on_ready):
+        """Deliver notified ids to callback until the connection fails."""
+        raw = self.engine.raw_connection()
+        try:
+            conn = raw.driver_connection
+            conn.autocommit = True
+            conn.cursor().execute(f"LISTEN {NOTIFY_CHANNEL}")
+            on_ready()
+            while True:
+                if select.select([conn], [], [], 60) == ([], [], []):
+                    # Quiet for a minute; make sure the connection is still there
+                    conn.cursor().execute("SELECT 1")
+                    continue
+                conn.poll()
+                ids = {int(n.payload) for n in conn.notifies}
+                conn.notifies.clear()
+                callback(ids)
+        finally:
+            raw.invalidate()
+
+
+class SocketChannel:
+    """Local stand-in for LISTEN/NOTIFY: every worker binds a Unix datagram
+    socket in a shared directory and notifications are sent to all of them."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f'{os.getpid()}.sock')
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(self.path)
+
+    def send(self, event_id):
+        payload = str(event_id).encode()
+        sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                try:
+                    sender.sendto(payload, path)
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # Worker exited without cleaning up its socket
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        pass
+                except BlockingIOError:
+                    pass
+        finally:
+            sender.close()
+
+    def listen(self, callback, on_ready):
+        on_ready()
+        while True:
+            payload = self.sock.recv(64)
+            callback({int(payload)})
+
+
+class SeatPublisher:
+    """Fans seat-count changes out to SSE subscribers in this worker.
+
+    Booking routes call notify() after commit; the event id travels over the
+    cross-worker channel, and each worker's dispatcher batches the ids that
+    arrived during SEAT_COALESCE_SECONDS into one seat-count query.
+    """
+
+    def __init__(self):
+        self.app = None
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+        self._streams = 0
+        self._pending = set()
+        self._wakeup = threading.Event()
+        self._pid = None
+        self._channel = None
+
+    def init_app(self, app):
+        self.app = app
+
+    def _make_channel(self):
+        kind = self.app.config['SEAT_CHANNEL']
+        if kind == 'auto':
+            uri = self.app.config['SQLALCHEMY_DATABASE_URI']
+            kind = 'postgres' if uri.startswith('postgres') else 'socket'
+        if kind == 'postgres':
+            with self.app.app_context():
+                return PostgresChannel(db.engine)
+        if kind == 'socket' and hasattr(socket, 'AF_UNIX'):
+            directory = self.app.config['SEAT_CHANNEL_DIR'] or os.path.join(
+                tempfile.gettempdir(), 'lera-seats')
+            return SocketChannel(directory)
+        return None
+
+    def _ensure_started(self):
+        # Threads don't survive fork, so start them lazily in each worker
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._channel = self._make_channel()
+            if self._channel:
+                threading.Thread(target=self._listen, daemon=True).start()
+            threading.Thread(target=self._dispatch, daemon=True).start()
+            self._pid = os.getpid()
+
+    def _listen(self):
+        # Reconnect whenever the channel fails. Updates sent while it was
+        # down were missed, so every subscribed event is refreshed once it
+        # listens again.
+        on_ready = lambda: None
+        while True:
+            try:
+                self._channel.listen(self._mark, on_ready=on_ready)
+            except Exception:
+                self.app.logger.exception("Seat channel failed, reconnecting in %ss", RECONNECT_SECONDS)
+            on_ready = self._resync
+            time.sleep(RECONNECT_SECONDS)
+
+    def _resync(self):
+        with self._lock:
+            event_ids = list(self._subscribers)
+        self._mark(event_ids)
+
+    def subscribe(self, event_ids, limit=None, subscription_class=Subscription):
+        """Register a subscription, or return None if this worker already
+        has ``limit`` open ones."""
+        self._ensure_started()
+        subscription = subscription_class(event_ids)
+        with self._lock:
+            if limit is not None and self._streams >= limit:
+                return None
+            self._streams += 1
+            for event_id in event_ids:
+                self._subscribers[event_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._streams -= 1
+            for event_id in subscription.event_ids:
+                subscribers = self._subscribers.get(event_id)
+                if subscribers:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[event_id]
+
+    def notify(self, event_id):
+        self._ensure_started()
+        if self._channel:
+            try:
+                self._channel.send(event_id)
+                return
+            except Exception:
+                self.app.logger.exception("Seat notification failed, delivering locally")
+        self._mark({event_id})
+
+    def _mark(self, event_ids):
+        with self._lock:
+            self._pending.update(i for i in event_ids if i in self._subscribers)
+            has_pending = bool(self._pending)
+        if has_pending:
+            self._wakeup.set()
+
+    def _dispatch(self):
+        while True:
+            self._wakeup.wait()
+            time.sleep(self.app.config['SEAT_COALESCE_SECONDS'])
+            with self._lock:
+                self._wakeup.clear()
+                event_ids, self._pending = self._pending, set()
+            if not event_ids:
+                continue
+            try:
+                with self.app.app_context():
+                    seats = seats_remaining(event_ids)
+            except Exception:
+                self.app.logger.exception("Seat count refresh failed")
+                continue
+            with self._lock:
+                targets = {}
+                for event_id, count in seats.items():
+                    for subscription in self._subscribers.get(event_id, ()):
+                        targets.setdefault(subscription, {})[event_id] = count
+            for subscription, update in targets.items():
+                subscription.push(update)
+
+
+seat_publisher = SeatPublisher()
+
+
+def sse_message(seats):
+    """One Server-Sent Event with seat counts, or a keep-alive comment."""
+    if not seats:
+        return ": keep-alive\n\n"
+    payload = json.dumps({str(k): v for k, v in seats.items()})
+    return f"event: seats\ndata: {payload}\n\n"
+
+
+def sse_stream(subscription, initial, heartbeat):
+    """Yield Server-Sent Events for a subscription until the client goes away."""
+    try:
+        seats = initial
+        while True:
+            yield sse_message(seats)
+            seats = subscription.wait(heartbeat)
+    finally:
+        seat_publisher.unsubscribe(subscription)
@@ -0,0 +1,95 @@
+import json
+import threading
+import time
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+from models import db, Category, Change
+from models.change import settled_seq
+from server.compression import PrecompressedBody
+
+
+class CategorySnapshot:
+    """Categories as of one version of the change log; never mutated."""
+
+    __slots__ = ('version', 'ids', 'body')
+
+    def __init__(self, version, categories):
+        self.version = version
+        self.ids = frozenset(c['id'] for c in categories)
+        self.body = PrecompressedBody(json.dumps(categories, separators=(',', ':')).encode() + b'\n')
+
+
+class CategoryCatalog:
+    """Per-worker category snapshot, loaded at startup.
+
+    Every category write is logged in ``changes`` (models/change.py), so the
+    newest settled category seq serves as a version (an unsettled one could
+    still be overtaken by a lower seq committing later). It is read at most
+    once per ``check_interval`` seconds and the snapshot is rebuilt when it
+    moves.
+    """
+
+    def __init__(self):
+        self.check_interval = 1.0
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._stale = False
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.check_interval = app.config['CATEGORY_CHECK_SECONDS']
+        with app.app_context():
+            self._reload(self._current_version())
+
+    @staticmethod
+    def _current_version():
+        conditions = [Change.entity == 'category']
+        settled = settled_seq(db.session.connection())
+        if settled is not None:
+            conditions.append(Change.seq <= settled)
+        return db.session.scalar(db.select(db.func.max(Change.seq)).where(*conditions)) or 0
+
+    def _reload(self, version):
+        categories = [c.to_dict() for c in Category.query.order_by(Category.id).all()]
+        self._snapshot = CategorySnapshot(version, categories)
+        self._checked_at = time.monotonic()
+        self._stale = False
+
+    def snapshot(self):
+        if self._snapshot is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return self._snapshot
+        with self._lock:
+            # Another thread may have checked while this one waited
+            if self._snapshot is None or time.monotonic() - self._checked_at >= self.check_interval:
+                version = self._current_version()
+                if self._snapshot is None or self._stale or version != self._snapshot.version:
+                    self._reload(version)
+                else:
+                    self._checked_at = time.monotonic()
+            return self._snapshot
+
+    def exists(self, category_id):
+        return category_id in self.snapshot().ids
+
+    def expire(self):
+        """Reload on the next access; a local write may not have settled
+        yet, so the version alone might not show it."""
+        self._stale = True
+        self._checked_at = 0.0
+
+
+category_catalog = CategoryCatalog()
+
+
+@sa_event.listens_for(Session, 'after_commit')
+def _expire_on_category_write(session):
+    # Writes in this worker show up at once; other workers catch up
+    # within check_interval
+    if session.info.pop('categories_changed', False):
+        category_catalog.expire()
+
+
+@sa_event.listens_for(Session, 'after_flush')
+def _note_category_write(session, flush_context):
+    if any(isinstance(obj, Category) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info['categories_changed'] = True
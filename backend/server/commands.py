@@ -0,0 +1,66 @@
+import click
+from flask import current_app
+from models import db
+from models.change import compact_changes
+from server.archive import archive_past_events
+from server.partitions import ensure_future_partitions
+from server.purge import purge_deleted_events
+from server.recommendations import build_recommendations
+
+
+def register_commands(app):
+    """Register maintenance commands, e.g. ``flask --app server.app compact-changes``."""
+
+    @app.cli.command('compact-changes')
+    def compact_changes_command():
+        """Drop change-log entries superseded by a newer one."""
+        removed = compact_changes()
+        click.echo(f"Removed {removed} superseded change(s)")
+
+    @app.cli.command('sweep-sessions')
+    def sweep_sessions_command():
+        """Delete expired server-side sessions."""
+        interface = current_app.session_interface
+        if not hasattr(interface, 'store'):
+            click.echo("SESSION_BACKEND is 'cookie'; nothing to sweep")
+            return
+        removed = interface.store.sweep()
+        click.echo(f"Removed {removed} expired session(s)")
+
+    @app.cli.command('build-recommendations')
+    @click.option('--incremental', is_flag=True, help="Only rebuild events with new activity.")
+    @click.option('--top-k', default=20, show_default=True)
+    def build_recommendations_command(incremental, top_k):
+        """Recompute similar-event recommendations from bookings and reviews."""
+        rebuilt = build_recommendations(top_k=top_k, incremental=incremental)
+        click.echo(f"Rebuilt recommendations for {rebuilt} event(s)")
+
+    @app.cli.command('purge-events')
+    @click.option('--batch-size', default=5000, show_default=True)
+    def purge_events_command(batch_size):
+        """Delete soft-deleted events with their bookings and reviews."""
+        purged = purge_deleted_events(batch_size=batch_size)
+        click.echo(f"Purged {purged} deleted event(s)")
+
+    @app.cli.command('archive-events')
+    @click.option('--days', type=int, help="Archive events older than this (default: ARCHIVE_AFTER_DAYS).")
+    @click.option('--batch-size', default=1000, show_default=True)
+    def archive_events_command(days, batch_size):
+        """Move past events with their bookings and reviews to the archive tables."""
+        if days is None:
+            days = current_app.config['ARCHIVE_AFTER_DAYS']
+        archived = archive_past_events(days, batch_size=batch_size)
+        click.echo(f"Archived {archived} event(s) older than {days} day(s)")
+
+    @app.cli.command('create-booking-partitions')
+    @click.option('--months-ahead', type=int, help="Default: BOOKING_PARTITION_MONTHS_AHEAD.")
+    def create_booking_partitions_command(months_ahead):
+        """Create upcoming monthly bookings partitions (PostgreSQL)."""
+        if months_ahead is None:
+            months_ahead = current_app.config['BOOKING_PARTITION_MONTHS_AHEAD']
+        with db.engine.begin() as conn:
+            names = ensure_future_partitions(conn, months_ahead)
+        if not names:
+            click.echo("bookings is not partitioned; nothing to do")
+            return
+        click.echo(f"Bookings partitions ready: {', '.join(names)}")
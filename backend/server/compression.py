@@ -0,0 +1,136 @@
+import zlib
+from flask import request
+
+# Optional encoders - used only when the package is installed
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Server preference order; the client's q-values still win
+def available_encodings():
+    encodings = []
+    if zstandard is not None:
+        encodings.append('zstd')
+    if brotli is not None:
+        encodings.append('br')
+    encodings.append('gzip')
+    return encodings
+
+
+def negotiate_encoding(accept_encodings):
+    """Pick the best supported encoding from a parsed Accept-Encoding header."""
+    return accept_encodings.best_match(available_encodings())
+
+
+def compress(data, encoding, level):
+    if encoding == 'gzip':
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def compress_stream(chunks, encoding, level):
+    """Compress an iterable of byte chunks, flushing after each chunk so
+    streamed responses reach the client without waiting for the end."""
+    if encoding == 'gzip':
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+    elif encoding == 'br':
+        compressor = brotli.Compressor(quality=level)
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+    elif encoding == 'zstd':
+        compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        yield compressor.flush()
+    else:
+        raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+class PrecompressedBody:
+    """A response body that keeps one compressed copy per encoding.
+
+    Response caches store this instead of raw bytes so a hot entry is
+    compressed once per encoding rather than once per request.
+    """
+
+    def __init__(self, data, mimetype='application/json'):
+        self.data = data
+        self.mimetype = mimetype
+        self._encoded = {}
+
+    def encoded(self, encoding, level):
+        body = self._encoded.get(encoding)
+        if body is None:
+            body = compress(self.data, encoding, level)
+            # Benign race: two threads may both compress, the result is identical
+            self._encoded[encoding] = body
+        return body
+
+
+def precompressed_response(app, body, status=200):
+    """Build a response from a PrecompressedBody for the current request."""
+    response = app.response_class(body.data, status=status, mimetype=body.mimetype)
+    response.vary.add('Accept-Encoding')
+    if len(body.data) < app.config['COMPRESS_MIN_SIZE']:
+        return response
+    encoding = negotiate_encoding(request.accept_encodings)
+    if encoding:
+        level = app.config['COMPRESS_LEVELS'][encoding]
+        response.set_data(body.encoded(encoding, level))
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def _should_skip(response):
+    return (
+        response.status_code < 200
+        or response.status_code in (204, 304)
+        or response.direct_passthrough
+        or 'Content-Encoding' in response.headers
+        or response.mimetype == 'text/event-stream'
+    )
+
+
+def init_compression(app):
+    """Register an after_request hook that compresses responses according
+    to the client's Accept-Encoding."""
+    if not app.config['COMPRESS_ENABLED']:
+        return
+
+    @app.after_request
+    def compress_response(response):
+        if _should_skip(response):
+            return response
+        response.vary.add('Accept-Encoding')
+
+        encoding = negotiate_encoding(request.accept_encodings)
+        if not encoding:
+            return response
+        level = app.config['COMPRESS_LEVELS'][encoding]
+
+        if response.is_streamed:
+            response.response = compress_stream(response.iter_encoded(), encoding, level)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < app.config['COMPRESS_MIN_SIZE']:
+                return response
+            response.set_data(compress(data, encoding, level))
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -14,4 +14,82 @@ class Config:
     db_path = os.path.join(instance_dir, 'lera.db')
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or f'sqlite:///{db_path}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
\ No newline at end of file
+    SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
+    CORS_ORIGINS = [
+        os.environ.get('FRONTEND_URL', 'http://localhost:5173'),
+        'http://localhost:5173',
+        'http://localhost:3000',
+    ]
+    
+    # Response compression (brotli/zstd are used only if installed)
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', '1') == '1'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_LEVELS = {'gzip': 6, 'br': 4, 'zstd': 3}
+    
+    # Live seat availability (Server-Sent Events)
+    SEAT_CHANNEL = os.environ.get('SEAT_CHANNEL', 'auto')  # auto, postgres, socket, none
+    SEAT_CHANNEL_DIR = os.environ.get('SEAT_CHANNEL_DIR')
+    SEAT_COALESCE_SECONDS = float(os.environ.get('SEAT_COALESCE_SECONDS', 0.25))
+    SSE_HEARTBEAT_SECONDS = 15
+    SSE_MAX_EVENTS = 50
+    # Open streams per worker process before new ones get a 503. Under
+    # gunicorn each holds a thread; gunicorn.conf.py adds this many threads
+    # on top of GUNICORN_THREADS so streams can't starve other requests.
+    # The ASGI entry point serves streams without threads.
+    SSE_MAX_STREAMS = int(os.environ.get('SSE_MAX_STREAMS', 32))
+    SSE_MAX_ASYNC_STREAMS = int(os.environ.get('SSE_MAX_ASYNC_STREAMS', 10000))
+    
+    # Threads that run the Flask-handled requests under server/asgi.py
+    ASGI_WSGI_THREADS = int(os.environ.get('ASGI_WSGI_THREADS', 16))
+    
+    # Sessions: 'database' (shared by all workers), 'memory' (single process)
+    # or 'cookie' (Flask's signed cookie)
+    SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'database')
+    SESSION_MEMORY_MAX_ENTRIES = 10000
+    SESSION_SWEEP_SECONDS = 300
+    
+    # Signed access tokens (HS256) and rotating refresh tokens
+    JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or SECRET_KEY
+    JWT_ACCESS_TTL_SECONDS = int(os.environ.get('JWT_ACCESS_TTL_SECONDS', 900))
+    JWT_REFRESH_TTL_SECONDS = int(os.environ.get('JWT_REFRESH_TTL_SECONDS', 30 * 24 * 3600))
+    JWT_VERIFY_CACHE_SIZE = 4096
+    
+    # Rate limits: blueprint or endpoint -> (count/period, 'ip' or 'user')
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', '1') == '1'
+    RATELIMIT_BACKEND = os.environ.get('RATELIMIT_BACKEND', 'memory')  # memory, sqlite
+    RATELIMIT_SQLITE_PATH = os.environ.get('RATELIMIT_SQLITE_PATH') or os.path.join(instance_dir, 'ratelimit.db')
+    RATELIMITS = {
+        'auth.login': ('10/minute', 'ip'),
+        'auth.register': ('5/minute', 'ip'),
+        'bookings.create_booking': ('20/minute', 'user'),
+        'events.bulk_create_events': ('10/hour', 'user'),
+    }
+    
+    # Number of reverse proxies in front of the app (Render: 1), so
+    # request.remote_addr is the client rather than the proxy
+    TRUST_PROXY_HOPS = int(os.environ.get('TRUST_PROXY_HOPS', 0))
+    
+    # Per-worker cache of GET /api/events/<id> responses
+    EVENT_CACHE_TTL_SECONDS = float(os.environ.get('EVENT_CACHE_TTL_SECONDS', 2))
+    EVENT_CACHE_STALE_SECONDS = float(os.environ.get('EVENT_CACHE_STALE_SECONDS', 30))
+    
+    # Trending: decayed bookings + weighted detail views
+    TRENDING_HALF_LIFE_HOURS = float(os.environ.get('TRENDING_HALF_LIFE_HOURS', 24))
+    TRENDING_VIEW_WEIGHT = float(os.environ.get('TRENDING_VIEW_WEIGHT', 0.1))
+    VIEW_FLUSH_SECONDS = float(os.environ.get('VIEW_FLUSH_SECONDS', 10))
+    
+    # Events this many days in the past move to the archive tables
+    # (flask archive-events)
+    ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 365))
+    
+    # PostgreSQL: monthly bookings partitions kept ready ahead of time
+    # (created at startup and by flask create-booking-partitions; run that
+    # monthly so deploys aren't the only thing keeping them ahead)
+    BOOKING_PARTITION_MONTHS_AHEAD = int(os.environ.get('BOOKING_PARTITION_MONTHS_AHEAD', 12))
+    
+    # How often each worker checks for category changes
+    CATEGORY_CHECK_SECONDS = float(os.environ.get('CATEGORY_CHECK_SECONDS', 1))
+    
+    # POST /api/events/bulk
+    BULK_IMPORT_MAX_ROWS = int(os.environ.get('BULK_IMPORT_MAX_ROWS', 100000))
+    BULK_IMPORT_CHUNK_SIZE = int(os.environ.get('BULK_IMPORT_CHUNK_SIZE', 1000))
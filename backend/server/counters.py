@@ -0,0 +1,75 @@
+import atexit
+import os
+import threading
+from collections import Counter
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db
+
+
+def upsert(table):
+    """INSERT ... ON CONFLICT statement for the current database (SQLite or
+    PostgreSQL). Callers add .on_conflict_do_update(...)."""
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        return postgresql.insert(table)
+    if dialect == 'sqlite':
+        return sqlite.insert(table)
+    raise NotImplementedError(f"Upserts are not supported on {dialect}")
+
+
+class BufferedCounter:
+    """Per-worker in-memory counter flushed to the database in batches.
+
+    add() only touches a dict under a lock; a background thread hands the
+    accumulated counts to ``flush_fn`` every ``interval`` seconds (inside an
+    app context), so a hot read path never waits on a write. Whatever is
+    pending when the process exits is flushed from an atexit hook.
+    """
+
+    def __init__(self, flush_fn):
+        self.flush_fn = flush_fn
+        self.app = None
+        self.interval = None
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def init_app(self, app, interval):
+        self.app = app
+        self.interval = interval
+
+    def add(self, key, amount=1):
+        if self._pid != os.getpid():
+            self._start()
+        with self._lock:
+            self._counts[key] += amount
+
+    def _start(self):
+        # Threads don't survive fork, so start the flusher lazily per worker
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._counts = Counter()
+            self._stop = threading.Event()
+            threading.Thread(target=self._run, daemon=True).start()
+            if self._pid is None:
+                atexit.register(self.flush)
+            self._pid = os.getpid()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        if not counts or self.app is None:
+            return
+        try:
+            with self.app.app_context():
+                self.flush_fn(dict(counts))
+        except Exception:
+            # e.g. SQLite busy during a long import; keep the counts for the next flush
+            self.app.logger.exception("Counter flush failed; retrying %d key(s) later", len(counts))
+            with self._lock:
+                self._counts.update(counts)
@@ -0,0 +1,88 @@
+import math
+
+# Vectorized distances when NumPy is installed
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+GEOHASH_PRECISION = 9  # ~5m cells, stored on every geolocated event
+
+
+def geohash_encode(lat, lng, precision=GEOHASH_PRECISION):
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits, bit_count = 0, 0
+    return ''.join(chars)
+
+
+def cell_size_degrees(precision):
+    """(lat degrees, lng degrees) covered by one geohash cell."""
+    lng_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def prefix_upper_bound(prefix):
+    """Smallest string sorting after every geohash that starts with prefix,
+    or None past the last cell. Made of BASE32 characters only, so the range
+    holds under any collation, unlike appending a character past 'z'."""
+    stripped = prefix.rstrip(BASE32[-1])
+    if not stripped:
+        return None
+    return stripped[:-1] + BASE32[BASE32.index(stripped[-1]) + 1]
+
+
+def covering_prefixes(lat, lng, radius_km):
+    """Geohash prefixes whose cells together cover the circle.
+
+    Picks the longest prefix whose cells are at least radius_km on each side,
+    then takes the cell containing the point and its 8 neighbours.
+    """
+    width_factor = max(math.cos(math.radians(lat)), 0.01)
+    precision = 1
+    for p in range(GEOHASH_PRECISION, 0, -1):
+        lat_deg, lng_deg = cell_size_degrees(p)
+        if lat_deg * KM_PER_DEGREE >= radius_km and lng_deg * KM_PER_DEGREE * width_factor >= radius_km:
+            precision = p
+            break
+    lat_deg, lng_deg = cell_size_degrees(precision)
+    prefixes = set()
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            y = min(max(lat + dy * lat_deg, -90.0), 90.0 - 1e-9)
+            x = (lng + dx * lng_deg + 180.0) % 360.0 - 180.0
+            prefixes.add(geohash_encode(y, x, precision))
+    return prefixes
+
+
+def haversine_km(lat, lng, lats, lngs):
+    """Distances in km from (lat, lng) to each point in lats/lngs."""
+    if np is not None:
+        lat1, lng1 = np.radians(lat), np.radians(lng)
+        lat2, lng2 = np.radians(np.asarray(lats, dtype=float)), np.radians(np.asarray(lngs, dtype=float))
+        a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+        return (2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))).tolist()
+    lat1, lng1 = math.radians(lat), math.radians(lng)
+    distances = []
+    for lat2, lng2 in zip(lats, lngs):
+        lat2, lng2 = math.radians(lat2), math.radians(lng2)
+        a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+        distances.append(2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a)))
+    return distances
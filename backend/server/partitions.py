@@ -0,0 +1,143 @@
+"""Monthly range partitions of ``bookings`` on PostgreSQL.
+
+The partitioned table's primary key is (id, created_at), since PostgreSQL
+requires the partition key in it; ids still come from one sequence, so the
+ORM keeps treating ``id`` alone as the identity. Rows outside every monthly
+partition land in ``bookings_default``. On other databases nothing here
+does anything and ``bookings`` stays a plain table.
+"""
+from datetime import date, datetime
+from sqlalchemy import text
+
+def _index_definitions(connection):
+    """CREATE INDEX statements for the secondary indexes bookings has now,
+    to recreate them on the table that replaces it."""
+    rows = connection.execute(text(
+        "SELECT indexdef FROM pg_indexes "
+        "WHERE tablename = 'bookings' AND schemaname = current_schema() "
+        "AND indexname NOT IN (SELECT conname FROM pg_constraint WHERE conrelid = 'bookings'::regclass)"
+    ))
+    # A partitioned table reports ON ONLY, which wouldn't reach the partitions
+    return [row[0].replace(' ON ONLY ', ' ON ') for row in rows]
+
+
+def _add_months(day, months):
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def is_partitioned(connection):
+    if connection.dialect.name != 'postgresql':
+        return False
+    return connection.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = 'bookings' AND c.relnamespace = current_schema()::regnamespace"
+    )).first() is not None
+
+
+def create_booking_partitions(connection, start, months):
+    """Create monthly partitions covering ``months`` months from ``start``'s
+    month; existing ones are left alone. Returns the partition names.
+
+    A partition can't be created while ``bookings_default`` holds rows in
+    its range, so those rows are moved into a standalone table that is then
+    attached as the partition.
+    """
+    names = []
+    first = date(start.year, start.month, 1)
+    for i in range(months):
+        lower, upper = _add_months(first, i), _add_months(first, i + 1)
+        name = f'bookings_{lower:%Y_%m}'
+        names.append(name)
+        if connection.execute(text("SELECT to_regclass(:name)"), {'name': name}).scalar():
+            continue
+        bounds = f"FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+        in_range = f"created_at >= '{lower.isoformat()}' AND created_at < '{upper.isoformat()}'"
+        stray = connection.execute(text(
+            f"SELECT 1 FROM bookings_default WHERE {in_range} LIMIT 1"
+        )).first()
+        if stray is None:
+            connection.execute(text(f"CREATE TABLE {name} PARTITION OF bookings FOR VALUES {bounds}"))
+            continue
+        connection.execute(text(f"CREATE TABLE {name} (LIKE bookings INCLUDING DEFAULTS)"))
+        connection.execute(text(
+            f"WITH moved AS (DELETE FROM bookings_default WHERE {in_range} RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ))
+        # Attaching adds the table's copies of the indexes and foreign keys
+        connection.execute(text(f"ALTER TABLE bookings ATTACH PARTITION {name} FOR VALUES {bounds}"))
+    return names
+
+
+def ensure_future_partitions(connection, months_ahead):
+    """Partitions for the current month and ``months_ahead`` after it."""
+    if not is_partitioned(connection):
+        return []
+    return create_booking_partitions(connection, datetime.utcnow(), months_ahead + 1)
+
+
+def partition_bookings(connection, months_ahead=3):
+    """Turn a plain ``bookings`` table into a partitioned one, copying rows.
+
+    Runs in the caller's transaction; the table is locked while rows are
+    copied, so convert large tables during a maintenance window.
+    """
+    if connection.dialect.name != 'postgresql' or is_partitioned(connection):
+        return
+    sequence = connection.execute(text("SELECT pg_get_serial_sequence('bookings', 'id')")).scalar()
+    indexes = _index_definitions(connection)
+    first = connection.execute(text("SELECT min(created_at) FROM bookings")).scalar() or datetime.utcnow()
+    now = datetime.utcnow()
+    months = (now.year - first.year) * 12 + now.month - first.month + months_ahead + 1
+
+    connection.execute(text("ALTER TABLE bookings RENAME TO bookings_unpartitioned"))
+    connection.execute(text(
+        "CREATE TABLE bookings (LIKE bookings_unpartitioned INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (created_at)"
+    ))
+    connection.execute(text("ALTER TABLE bookings ALTER COLUMN created_at SET NOT NULL"))
+    connection.execute(text("CREATE TABLE bookings_default PARTITION OF bookings DEFAULT"))
+    create_booking_partitions(connection, first, months)
+
+    columns = [row[0] for row in connection.execute(text(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_name = 'bookings_unpartitioned' AND table_schema = current_schema() "
+        "ORDER BY ordinal_position"
+    ))]
+    select = ', '.join('coalesce(created_at, now())' if c == 'created_at' else c for c in columns)
+    connection.execute(text(
+        f"INSERT INTO bookings ({', '.join(columns)}) SELECT {select} FROM bookings_unpartitioned"
+    ))
+    if sequence:
+        connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY bookings.id"))
+    connection.execute(text("DROP TABLE bookings_unpartitioned"))
+
+    # Constraint and index names are free again now the old table is gone
+    connection.execute(text("ALTER TABLE bookings ADD PRIMARY KEY (id, created_at)"))
+    connection.execute(text("ALTER TABLE bookings ADD FOREIGN KEY (user_id) REFERENCES users (id)"))
+    connection.execute(text(
+        "ALTER TABLE bookings ADD FOREIGN KEY (event_id) REFERENCES events (id) ON DELETE CASCADE"
+    ))
+    for statement in indexes:
+        connection.execute(text(statement))
+
+
+def unpartition_bookings(connection):
+    """Reverse partition_bookings()."""
+    if not is_partitioned(connection):
+        return
+    sequence = connection.execute(text("SELECT pg_get_serial_sequence('bookings', 'id')")).scalar()
+    indexes = _index_definitions(connection)
+    connection.execute(text("ALTER TABLE bookings RENAME TO bookings_partitioned"))
+    connection.execute(text("CREATE TABLE bookings (LIKE bookings_partitioned INCLUDING DEFAULTS)"))
+    connection.execute(text("INSERT INTO bookings SELECT * FROM bookings_partitioned"))
+    if sequence:
+        connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY bookings.id"))
+    connection.execute(text("DROP TABLE bookings_partitioned CASCADE"))
+    connection.execute(text("ALTER TABLE bookings ADD PRIMARY KEY (id)"))
+    connection.execute(text("ALTER TABLE bookings ADD FOREIGN KEY (user_id) REFERENCES users (id)"))
+    connection.execute(text(
+        "ALTER TABLE bookings ADD FOREIGN KEY (event_id) REFERENCES events (id) ON DELETE CASCADE"
+    ))
+    for statement in indexes:
+        connection.execute(text(statement))
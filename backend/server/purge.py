@@ -0,0 +1,34 @@
+from models import db, Event, Booking, Review
+from models.change import record_changes
+
+
+def purge_deleted_events(batch_size=5000):
+    """Remove soft-deleted events for good.
+
+    Bookings and reviews go first, ``batch_size`` rows per transaction, so
+    an event with millions of bookings never holds one huge transaction or
+    loads its children into memory. Returns the number of events purged.
+    """
+    event_ids = db.session.scalars(
+        db.select(Event.id)
+        .where(Event.deleted_at.is_not(None))
+        .execution_options(include_deleted=True)
+    ).all()
+    for event_id in event_ids:
+        for model, entity in ((Booking, None), (Review, 'review')):
+            while True:
+                ids = db.session.scalars(
+                    db.select(model.id).where(model.event_id == event_id).limit(batch_size)
+                ).all()
+                if not ids:
+                    break
+                db.session.execute(db.delete(model).where(model.id.in_(ids)))
+                if entity:
+                    record_changes(db.session.connection(), entity, ids, 'delete')
+                db.session.commit()
+        # Views, trending and recommendation rows cascade in the database
+        db.session.execute(
+            db.delete(Event).where(Event.id == event_id).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    return len(event_ids)
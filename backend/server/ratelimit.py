@@ -0,0 +1,133 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from flask import g, jsonify, request
+from routes.auth import CSRFError, load_identity
+from server.tokens import InvalidToken
+
+
+def parse_limit(spec):
+    """'10/minute' -> (tokens per second, burst size)."""
+    count, _, period = spec.partition('/')
+    seconds = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}[period]
+    return int(count) / seconds, int(count)
+
+
+class MemoryBucketStore:
+    """Token buckets kept in this process."""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = {}  # key -> [tokens, updated_at]
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst, now):
+        """Take one token; return 0 if allowed, else seconds until one is available."""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._prune(now)
+                bucket = self._buckets[key] = [burst, now]
+            tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                return 0
+            bucket[0] = tokens
+            return (1 - tokens) / rate
+
+    def _prune(self, now):
+        # Buckets idle for a minute or more are dropped
+        stale = [key for key, (_, updated_at) in self._buckets.items() if now - updated_at >= 60]
+        for key in stale:
+            del self._buckets[key]
+
+
+class SQLiteBucketStore:
+    """Token buckets in a local SQLite file, shared by all workers on a host."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def take(self, key, rate, burst, now):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens = burst if row is None else min(burst, row[0] + (now - row[1]) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            conn.execute(
+                "INSERT INTO buckets (key, tokens, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+                (key, tokens, now)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return 0 if allowed else (1 - tokens) / rate
+
+
+def _client_key(per):
+    if per == 'user':
+        # Identity is resolved the same way login_required does it; when it
+        # fails, the request is counted per IP and login_required rejects it
+        try:
+            if load_identity():
+                return f'user:{g.user_id}'
+        except (InvalidToken, CSRFError):
+            pass
+    return f'ip:{request.remote_addr}'
+
+
+def init_rate_limits(app):
+    """Apply RATELIMITS to matching requests.
+
+    Keys are blueprint names ('auth') or endpoints ('auth.login'); values are
+    (spec, per) such as ('10/minute', 'ip') or ('20/minute', 'user'). A
+    request matching both a blueprint and an endpoint entry must pass both.
+    """
+    if not app.config['RATELIMIT_ENABLED']:
+        return
+    if app.config['RATELIMIT_BACKEND'] == 'sqlite':
+        store = SQLiteBucketStore(app.config['RATELIMIT_SQLITE_PATH'])
+    else:
+        store = MemoryBucketStore()
+    limits = {scope: (*parse_limit(spec), per)
+              for scope, (spec, per) in app.config['RATELIMITS'].items()}
+
+    @app.before_request
+    def check_rate_limit():
+        if request.method == 'OPTIONS':
+            return None
+        for scope in (request.endpoint, request.blueprint):
+            limit = limits.get(scope)
+            if limit is None:
+                continue
+            rate, burst, per = limit
+            retry_after = store.take(f'{scope}:{_client_key(per)}', rate, burst, time.time())
+            if retry_after:
+                response = jsonify({"error": "Too many requests"})
+                response.status_code = 429
+                response.headers['Retry-After'] = str(math.ceil(retry_after))
+                return response
+        return None
@@ -0,0 +1,102 @@
+import heapq
+import math
+from collections import Counter, defaultdict
+from datetime import datetime
+from models import db, Booking, Event, Review, EventRecommendation
+
+# Reviews at or above this rating count as a positive interaction
+POSITIVE_RATING = 4
+INSERT_CHUNK = 5000
+
+
+def load_interactions():
+    """Sparse user x event incidence as {user_id: set(event_ids)} plus its
+    transpose {event_id: set(user_ids)}, from bookings and good reviews."""
+    by_user, by_event = defaultdict(set), defaultdict(set)
+    bookings = db.select(Booking.user_id, Booking.event_id).where(Booking.status != 'cancelled')
+    reviews = db.select(Review.user_id, Review.event_id).where(Review.rating >= POSITIVE_RATING)
+    for query in (bookings, reviews):
+        for user_id, event_id in db.session.execute(query.execution_options(yield_per=50000)):
+            by_user[user_id].add(event_id)
+            by_event[event_id].add(user_id)
+    return by_user, by_event
+
+
+def category_affinity(user_id):
+    """One user's row of the user x category matrix: the share of their
+    bookings and good reviews that fall in each category."""
+    interactions = db.union_all(
+        db.select(Booking.event_id).where(Booking.user_id == user_id, Booking.status != 'cancelled'),
+        db.select(Review.event_id).where(Review.user_id == user_id, Review.rating >= POSITIVE_RATING)
+    ).subquery()
+    rows = db.session.execute(
+        db.select(Event.category_id, db.func.count())
+        .join(interactions, interactions.c.event_id == Event.id)
+        .where(Event.category_id.is_not(None))
+        .group_by(Event.category_id)
+    ).all()
+    total = sum(count for _, count in rows)
+    return {category_id: count / total for category_id, count in rows}
+
+
+def touched_events(since, by_user):
+    """Events whose similarity rows can change because of activity after ``since``:
+    everything in the baskets of users who booked or reviewed since then."""
+    users = set(db.session.scalars(
+        db.select(Booking.user_id).where(Booking.created_at > since)
+        .union(db.select(Review.user_id).where(Review.created_at > since))
+    ))
+    events = set()
+    for user_id in users:
+        events |= by_user.get(user_id, set())
+    return events
+
+
+def similar_events(event_id, by_user, by_event, top_k):
+    """Top-K events by cosine similarity of their user vectors."""
+    co_counts = Counter()
+    for user_id in by_event[event_id]:
+        co_counts.update(by_user[user_id])
+    del co_counts[event_id]
+    degree = len(by_event[event_id])
+    scored = ((count / math.sqrt(degree * len(by_event[other])), other)
+              for other, count in co_counts.items())
+    return heapq.nlargest(top_k, scored)
+
+
+def build_recommendations(top_k=20, incremental=False):
+    """Recompute top-K neighbours and store them in event_recommendations.
+
+    Incremental runs only rebuild the rows of events touched by bookings and
+    reviews made since the previous run. Returns the number of events rebuilt.
+    """
+    started_at = datetime.utcnow()
+    by_user, by_event = load_interactions()
+
+    targets = set(by_event)
+    if incremental:
+        since = db.session.scalar(db.select(db.func.max(EventRecommendation.updated_at)))
+        if since is not None:
+            targets = touched_events(since, by_user) & targets
+
+    table = EventRecommendation.__table__
+    if incremental:
+        target_list = list(targets)
+        for i in range(0, len(target_list), INSERT_CHUNK):
+            db.session.execute(table.delete().where(
+                table.c.event_id.in_(target_list[i:i + INSERT_CHUNK])))
+    else:
+        db.session.execute(table.delete())
+
+    rows = []
+    for event_id in targets:
+        for rank, (score, neighbor_id) in enumerate(similar_events(event_id, by_user, by_event, top_k)):
+            rows.append({'event_id': event_id, 'rank': rank, 'neighbor_id': neighbor_id,
+                         'score': score, 'updated_at': started_at})
+        if len(rows) >= INSERT_CHUNK:
+            db.session.execute(table.insert(), rows)
+            rows = []
+    if rows:
+        db.session.execute(table.insert(), rows)
+    db.session.commit()
+    return len(targets)
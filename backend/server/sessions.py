@@ -0,0 +1,196 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from flask.sessions import SessionInterface, SessionMixin, session_json_serializer
+from werkzeug.datastructures import CallbackDict
+from models import db, UserSession
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, new=False, expires_at=None):
+        def on_update(self):
+            self.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.expires_at = expires_at
+        self.replaced_sid = None
+        self.modified = False
+
+    def regenerate(self):
+        # New id on login so a pre-login session id can't be fixated
+        if not self.new:
+            self.replaced_sid = self.sid
+        self.sid = secrets.token_urlsafe(32)
+        self.new = True
+        self.modified = True
+
+
+class MemorySessionStore:
+    """LRU session store for a single process. Sessions are lost on restart
+    and are not shared between workers."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # sid -> (data, expires_at)
+        self._lock = threading.Lock()
+
+    def load(self, sid):
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is None:
+                return None
+            if entry[1] <= datetime.utcnow():
+                del self._entries[sid]
+                return None
+            self._entries.move_to_end(sid)
+            return entry
+
+    def save(self, sid, data, expires_at, new):
+        with self._lock:
+            self._entries[sid] = (dict(data), expires_at)
+            self._entries.move_to_end(sid)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, sid):
+        with self._lock:
+            self._entries.pop(sid, None)
+
+    def sweep(self):
+        now = datetime.utcnow()
+        with self._lock:
+            expired = [sid for sid, (_, expires_at) in self._entries.items() if expires_at <= now]
+            for sid in expired:
+                del self._entries[sid]
+        return len(expired)
+
+
+class DatabaseSessionStore:
+    """Session store shared by all workers through the sessions table.
+
+    Uses its own short transactions so it works regardless of the state the
+    request left db.session in.
+    """
+
+    table = UserSession.__table__
+
+    def load(self, sid):
+        with db.engine.connect() as conn:
+            row = conn.execute(
+                db.select(self.table.c.data, self.table.c.expires_at)
+                .where(self.table.c.id == sid)
+            ).first()
+        if row is None or row.expires_at <= datetime.utcnow():
+            return None
+        return session_json_serializer.loads(row.data), row.expires_at
+
+    def save(self, sid, data, expires_at, new):
+        values = {
+            'data': session_json_serializer.dumps(dict(data)),
+            'expires_at': expires_at,
+        }
+        with db.engine.begin() as conn:
+            if new:
+                conn.execute(self.table.insert().values(id=sid, **values))
+            else:
+                conn.execute(self.table.update().where(self.table.c.id == sid).values(**values))
+
+    def delete(self, sid):
+        with db.engine.begin() as conn:
+            conn.execute(self.table.delete().where(self.table.c.id == sid))
+
+    def sweep(self):
+        # Range delete on the expires_at index
+        with db.engine.begin() as conn:
+            result = conn.execute(
+                self.table.delete().where(self.table.c.expires_at <= datetime.utcnow())
+            )
+        return result.rowcount
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Keeps session data on the server; the cookie holds only a random id.
+
+    Logging out clears the session, which deletes it from the store, so the
+    old cookie can't be replayed.
+    """
+
+    session_class = ServerSideSession
+
+    def __init__(self, store, sweep_interval):
+        self.store = store
+        self.sweep_interval = sweep_interval
+        self._last_sweep = time.monotonic()
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            entry = self.store.load(sid)
+            if entry is not None:
+                data, expires_at = entry
+                return self.session_class(data, sid=sid, expires_at=expires_at)
+        return self.session_class(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        self._maybe_sweep(app)
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.replaced_sid:
+            self.store.delete(session.replaced_sid)
+
+        if not session:
+            if session.modified and not session.new:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        lifetime = app.permanent_session_lifetime
+        now = datetime.utcnow()
+        # Extend the expiry once less than half of the lifetime is left
+        # instead of writing the store on every request
+        refresh = session.expires_at is None or session.expires_at - now < lifetime / 2
+        if not (session.modified or refresh):
+            return
+
+        expires_at = now + lifetime
+        self.store.save(session.sid, session, expires_at, session.new)
+        session.new = False
+        response.set_cookie(
+            name, session.sid,
+            expires=expires_at,
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+    def _maybe_sweep(self, app):
+        now = time.monotonic()
+        if now - self._last_sweep < self.sweep_interval:
+            return
+        self._last_sweep = now
+        try:
+            self.store.sweep()
+        except Exception:
+            app.logger.exception("Session sweep failed")
+
+
+def init_sessions(app):
+    """Install the server-side session store chosen by SESSION_BACKEND
+    (``database``, ``memory`` or ``cookie`` for Flask's signed cookies)."""
+    backend = app.config['SESSION_BACKEND']
+    if backend == 'cookie':
+        return
+    if backend == 'memory':
+        store = MemorySessionStore(app.config['SESSION_MEMORY_MAX_ENTRIES'])
+    elif backend == 'database':
+        store = DatabaseSessionStore()
+    else:
+        raise ValueError(f"Unknown SESSION_BACKEND: {backend}")
+    app.session_interface = ServerSideSessionInterface(store, app.config['SESSION_SWEEP_SECONDS'])
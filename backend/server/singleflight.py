@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution.
+
+    The first caller runs the function; callers arriving while it is running
+    wait for and share its result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def in_flight(self, key):
+        return key in self._calls
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class ResponseCache:
+    """Per-worker LRU of rendered responses with single-flight loading.
+
+    Entries are fresh for ``ttl`` seconds. For ``stale_ttl`` seconds after
+    that, one request reloads the entry while concurrent requests keep being
+    served the stale copy. A miss or a fully expired entry is loaded once
+    however many requests ask for it at the same time.
+    """
+
+    def __init__(self, ttl, stale_ttl, max_entries=1024):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.flight = SingleFlight()
+        self._entries = OrderedDict()  # key -> (value, loaded_at)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, load):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None:
+            value, loaded_at = entry
+            age = time.monotonic() - loaded_at
+            if age < self.ttl:
+                return value
+            if age < self.ttl + self.stale_ttl and self.flight.in_flight(key):
+                return value
+        return self.flight.do(key, lambda: self._load(key, load))
+
+    def _load(self, key, load):
+        generation = self._generation
+        value = load()
+        with self._lock:
+            # Don't store a value loaded before an invalidation
+            if generation != self._generation:
+                return value
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, predicate):
+        """Drop every entry whose key matches ``predicate``."""
+        with self._lock:
+            self._generation += 1
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
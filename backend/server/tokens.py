@@ -0,0 +1,151 @@
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from flask import current_app
+from models import db, RefreshToken
+
+# Compact JWT header for HS256; the only algorithm we issue or accept
+HEADER = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b'=').decode()
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+
+def _b64decode(data):
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
+def _sign(signing_input):
+    key = current_app.config['JWT_SECRET_KEY'].encode()
+    return _b64encode(hmac.new(key, signing_input.encode(), hashlib.sha256).digest())
+
+
+def looks_like_jwt(token):
+    return token.startswith(HEADER + '.') and token.count('.') == 2
+
+
+class VerifiedTokenCache:
+    """LRU of tokens whose signature already checked out, so hot tokens skip
+    the HMAC and JSON decoding. Expiry is still checked on every hit."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        with self._lock:
+            claims = self._entries.get(token)
+            if claims is not None:
+                self._entries.move_to_end(token)
+            return claims
+
+    def put(self, token, claims):
+        with self._lock:
+            self._entries[token] = claims
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_verified = None
+
+
+def _cache():
+    global _verified
+    if _verified is None:
+        _verified = VerifiedTokenCache(current_app.config['JWT_VERIFY_CACHE_SIZE'])
+    return _verified
+
+
+def issue_access_token(user):
+    now = int(time.time())
+    claims = {
+        'sub': user.id,
+        'role': user.role,
+        'iat': now,
+        'exp': now + current_app.config['JWT_ACCESS_TTL_SECONDS'],
+    }
+    payload = _b64encode(json.dumps(claims, separators=(',', ':')).encode())
+    signing_input = f'{HEADER}.{payload}'
+    return f'{signing_input}.{_sign(signing_input)}'
+
+
+def verify_access_token(token):
+    """Return the token's claims, or raise InvalidToken."""
+    claims = _cache().get(token)
+    if claims is None:
+        signing_input, _, signature = token.rpartition('.')
+        if not looks_like_jwt(token) or not hmac.compare_digest(signature, _sign(signing_input)):
+            raise InvalidToken("Invalid token")
+        try:
+            claims = json.loads(_b64decode(signing_input.split('.')[1]))
+        except ValueError:
+            raise InvalidToken("Invalid token")
+        _cache().put(token, claims)
+    if claims['exp'] <= time.time():
+        raise InvalidToken("Token expired")
+    return claims
+
+
+def _hash(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def issue_refresh_token(user_id):
+    token = secrets.token_urlsafe(32)
+    ttl = timedelta(seconds=current_app.config['JWT_REFRESH_TTL_SECONDS'])
+    db.session.add(RefreshToken(
+        token_hash=_hash(token),
+        user_id=user_id,
+        expires_at=datetime.utcnow() + ttl
+    ))
+    return token
+
+
+def rotate_refresh_token(token):
+    """Revoke a refresh token and issue its replacement.
+
+    Returns (user_id, new_token). Presenting an already-revoked token means
+    it was stolen or replayed, so every refresh token of that user is revoked.
+    The caller commits.
+
+    The token is claimed with a single conditional UPDATE, so of two
+    concurrent requests presenting it only one gets a replacement; the
+    other sees it revoked.
+    """
+    token_hash = _hash(token)
+    now = datetime.utcnow()
+    claimed = RefreshToken.query.filter(
+        RefreshToken.token_hash == token_hash,
+        RefreshToken.revoked_at.is_(None),
+        RefreshToken.expires_at > now
+    ).update({'revoked_at': now}, synchronize_session=False)
+    record = RefreshToken.query.filter_by(token_hash=token_hash).first()
+    if claimed == 1:
+        return record.user_id, issue_refresh_token(record.user_id)
+    if record is None or record.expires_at <= now:
+        raise InvalidToken("Invalid refresh token")
+    revoke_user_refresh_tokens(record.user_id)
+    db.session.commit()
+    raise InvalidToken("Refresh token reuse detected")
+
+
+def revoke_refresh_token(token):
+    RefreshToken.query.filter_by(token_hash=_hash(token), revoked_at=None).update(
+        {'revoked_at': datetime.utcnow()})
+
+
+def revoke_user_refresh_tokens(user_id):
+    RefreshToken.query.filter_by(user_id=user_id, revoked_at=None).update(
+        {'revoked_at': datetime.utcnow()})
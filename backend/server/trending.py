@@ -0,0 +1,90 @@
+"""Trending events from exponentially decayed activity counters.
+
+An event's score is the sum over its bookings (tickets) and weighted detail
+views of ``2 ** -(age / half_life)``. Rather than decaying every row as time
+passes, increments are stored forward-decayed: an increment at time t adds
+``2 ** ((t - start) / half_life)``, which keeps the relative order of all
+scores correct, so an update is a single-row UPSERT and the ranking is an
+index scan on ``score``.
+
+To keep the weights finite, time is split into generations of
+GENERATION_HALF_LIVES half-lives, each with its own start. A row from the
+previous generation is rescaled the next time it is touched; rows older
+than that have decayed to nothing and are reset.
+"""
+import time
+from models import db, Event, EventTrending
+from server.config import Config
+from server.counters import upsert
+
+GENERATION_HALF_LIVES = 256
+ROLLOVER = 2.0 ** -GENERATION_HALF_LIVES
+
+table = EventTrending.__table__
+
+
+def generation_weight(now=None):
+    """(generation, weight of an increment made at ``now``)."""
+    half_lives = (time.time() if now is None else now) / (Config.TRENDING_HALF_LIFE_HOURS * 3600)
+    generation = int(half_lives // GENERATION_HALF_LIVES)
+    return generation, 2.0 ** (half_lives - generation * GENERATION_HALF_LIVES)
+
+
+def _decayed(column, generation, increment):
+    return db.case(
+        (table.c.generation == generation, column + increment),
+        (table.c.generation == generation - 1, column * ROLLOVER + increment),
+        else_=increment,
+    )
+
+
+def record_activity(connection, bookings=None, views=None, now=None):
+    """Add ``{event_id: count}`` bookings and views to the trending scores."""
+    bookings, views = bookings or {}, views or {}
+    generation, weight = generation_weight(now)
+    rows = []
+    for event_id in bookings.keys() | views.keys():
+        booking_score = bookings.get(event_id, 0) * weight
+        view_score = views.get(event_id, 0) * weight
+        rows.append({
+            'event_id': event_id,
+            'generation': generation,
+            'booking_score': booking_score,
+            'view_score': view_score,
+            'score': booking_score + view_score * Config.TRENDING_VIEW_WEIGHT,
+        })
+    if not rows:
+        return
+    stmt = upsert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['event_id'],
+        set_={
+            'generation': generation,
+            'booking_score': _decayed(table.c.booking_score, generation, stmt.excluded.booking_score),
+            'view_score': _decayed(table.c.view_score, generation, stmt.excluded.view_score),
+            'score': _decayed(table.c.score, generation, stmt.excluded.score),
+        },
+    )
+    connection.execute(stmt, rows)
+
+
+def top_event_ids(limit, *conditions, now=None):
+    """[(event_id, score)] best first, scores decayed to ``now``.
+    ``conditions`` filter on Event columns.
+
+    Reads the top of the current and the previous generation from the
+    (generation, score) index and merges them.
+    """
+    generation, weight = generation_weight(now)
+    candidates = []
+    for gen, scale in ((generation, 1.0), (generation - 1, ROLLOVER)):
+        stmt = (db.select(table.c.event_id, table.c.score)
+                # The soft-delete filter doesn't reach explicit joins
+                .join(Event, db.and_(Event.id == table.c.event_id, Event.deleted_at.is_(None)))
+                .where(table.c.generation == gen, *conditions)
+                .order_by(table.c.score.desc())
+                .limit(limit))
+        candidates += [(event_id, score * scale / weight) for event_id, score in db.session.execute(stmt)]
+    candidates.sort(key=lambda c: c[1], reverse=True)
+    return candidates[:limit]
+
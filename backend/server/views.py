@@ -0,0 +1,37 @@
+from datetime import datetime
+from models import db, Event, EventView
+from server.counters import BufferedCounter, upsert
+from server.trending import record_activity
+
+table = EventView.__table__
+
+
+def record_views(connection, counts, now=None):
+    """Add ``{event_id: views}`` to the per-event totals in one statement."""
+    now = now or datetime.utcnow()
+    stmt = upsert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['event_id'],
+        set_={
+            'view_count': table.c.view_count + stmt.excluded.view_count,
+            'last_viewed_at': stmt.excluded.last_viewed_at,
+        },
+    )
+    connection.execute(stmt, [
+        {'event_id': event_id, 'view_count': n, 'last_viewed_at': now}
+        for event_id, n in counts.items()
+    ])
+
+
+def _flush_views(counts):
+    with db.engine.begin() as conn:
+        # Skip events deleted since they were viewed
+        existing = set(conn.scalars(db.select(Event.id).where(Event.id.in_(counts))))
+        counts = {event_id: n for event_id, n in counts.items() if event_id in existing}
+        if counts:
+            record_views(conn, counts)
+            record_activity(conn, views=counts)
+
+
+# GET /api/events/<id> hits, counted per worker and written in batches
+view_counter = BufferedCounter(_flush_views)
@@ -0,0 +1,12 @@
+import os
+import sys
+
+# Add backend directory to Python path for imports
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from server.app import create_app
+
+# Module-level app for WSGI servers: gunicorn -c gunicorn.conf.py server.wsgi:app
+app = create_app()
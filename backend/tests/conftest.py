@@ -0,0 +1,108 @@
+import os
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event as sa_event
+
+# Set before server.config is imported: every app gets its own in-memory
+# database, and seat updates aren't shared between processes
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ['SEAT_CHANNEL'] = 'none'
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from server.app import create_app
+from models import db, User, Event, Category
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Bearer headers for a freshly registered admin."""
+    user_data = {
+        'username': 'testuser',
+        'email': 'test@example.com',
+        'password': 'testpass123',
+        'role': 'admin'
+    }
+    response = client.post('/api/auth/register', json=user_data)
+    return {'Authorization': f"Bearer {response.json['access_token']}"}
+
+
+@pytest.fixture
+def make_events(app):
+    """Create events, each with its own organizer and category, and return
+    their ids."""
+    created = []
+
+    def make(count):
+        with app.app_context():
+            events = []
+            for i in range(len(created), len(created) + count):
+                organizer = User(username=f'organizer{i}', email=f'organizer{i}@example.com',
+                                 password_hash='-', role='organizer')
+                category = Category(name=f'category{i}')
+                events.append(Event(
+                    title=f'Event {i}', location='Nairobi', capacity=100, price=10.0,
+                    date=datetime.utcnow() + timedelta(days=30 + i),
+                    organizer=organizer, category=category
+                ))
+            db.session.add_all(events)
+            db.session.commit()
+            ids = [event.id for event in events]
+        created.extend(ids)
+        return ids
+    return make
+
+
+@contextmanager
+def recorded_queries(app):
+    """Collect (statement, parameters) for the SQL run inside the block."""
+    queries = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        queries.append((statement, parameters))
+    with app.app_context():
+        engine = db.engine
+    sa_event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield queries
+    finally:
+        sa_event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager collecting the queries run inside it."""
+    return lambda: recorded_queries(app)
+
+
+@pytest.fixture
+def query_plans(app):
+    """Send a request and return the SQLite EXPLAIN QUERY PLAN steps of the
+    SELECTs it ran, one string per step (e.g. 'SEARCH bookings USING INDEX
+    ix_... (user_id=?)')."""
+    def plans(send):
+        with recorded_queries(app) as queries:
+            response = send()
+        assert response.status_code == 200
+        steps = []
+        with app.app_context(), db.engine.connect() as conn:
+            for statement, parameters in queries:
+                if statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+                    result = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)
+                    steps += [row[3] for row in result]
+        return steps
+    return plans
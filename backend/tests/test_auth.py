@@ -0,0 +1,27 @@
+def register(client):
+    response = client.post('/api/auth/register', json={
+        'username': 'testuser',
+        'email': 'test@example.com',
+        'password': 'testpass123'
+    })
+    assert response.status_code == 201
+    return response.headers['X-CSRF-Token']
+
+
+def test_session_write_without_csrf_token_is_forbidden(client, make_events):
+    """Cookie-session writes must echo X-CSRF-Token, including rate-limited ones"""
+    [event_id] = make_events(1)
+    register(client)
+    booking = {'event_id': event_id, 'tickets_count': 1}
+    assert client.post('/api/bookings/', json=booking).status_code == 403
+    assert client.post('/api/bookings/', json=booking, headers={'X-CSRF-Token': 'wrong'}).status_code == 403
+    assert client.post('/api/events/bulk', json=[]).status_code == 403
+
+
+def test_session_write_with_csrf_token_is_allowed(client, make_events):
+    [event_id] = make_events(1)
+    csrf_token = register(client)
+    response = client.post('/api/bookings/', json={'event_id': event_id, 'tickets_count': 1},
+                           headers={'X-CSRF-Token': csrf_token})
+    assert response.status_code == 201
+    assert client.get('/api/auth/me').headers['X-CSRF-Token'] == csrf_token
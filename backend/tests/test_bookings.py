@@ -0,0 +1,46 @@
+def test_list_expand_runs_fixed_number_of_queries(client, auth_headers, make_events, count_queries):
+    """?expand=event loads every booking's event in the same query"""
+    def book(event_ids):
+        for event_id in event_ids:
+            response = client.post('/api/bookings/', json={'event_id': event_id, 'tickets_count': 1},
+                                   headers=auth_headers)
+            assert response.status_code == 201
+
+    book(make_events(2))
+    with count_queries() as few:
+        response = client.get('/api/bookings/?expand=event', headers=auth_headers)
+    assert response.status_code == 200
+
+    book(make_events(8))
+    with count_queries() as many:
+        response = client.get('/api/bookings/?expand=event', headers=auth_headers)
+    assert len(response.json['bookings']) == 10
+    assert all(booking['event']['capacity'] for booking in response.json['bookings'])
+    assert len(many) == len(few)
+
+
+def test_create_coerces_numeric_strings(client, auth_headers, make_events):
+    [event_id] = make_events(1)
+    response = client.post('/api/bookings/', json={'event_id': str(event_id), 'tickets_count': '2'},
+                           headers=auth_headers)
+    assert response.status_code == 201
+    assert response.json['tickets_count'] == 2
+
+
+def test_create_rejects_invalid_ticket_counts(client, auth_headers, make_events):
+    [event_id] = make_events(1)
+    for tickets_count in (0, -3, 'two', None):
+        response = client.post('/api/bookings/', json={'event_id': event_id, 'tickets_count': tickets_count},
+                               headers=auth_headers)
+        assert response.status_code == 400
+    response = client.post('/api/bookings/', json={'tickets_count': 1}, headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_list_searches_user_index(client, auth_headers, make_events, query_plans):
+    """EXPLAIN: a user's bookings come from (user_id, created_at, id), not a table scan"""
+    for event_id in make_events(3):
+        client.post('/api/bookings/', json={'event_id': event_id, 'tickets_count': 1}, headers=auth_headers)
+    steps = query_plans(lambda: client.get('/api/bookings/', headers=auth_headers))
+    assert any(step.startswith('SEARCH bookings USING INDEX ix_bookings_user_id_created_at_id') for step in steps)
+    assert not any(step.startswith('SCAN bookings') for step in steps)
@@ -0,0 +1,83 @@
+from models import db, Event
+from server.recommendations import build_recommendations
+
+
+def test_list_expand_runs_fixed_number_of_queries(client, make_events, count_queries):
+    """?expand= eager loads relationships instead of one query per event"""
+    make_events(2)
+    with count_queries() as few:
+        response = client.get('/api/events/?expand=organizer,category')
+    assert response.status_code == 200
+    assert all(event['organizer'] and event['category'] for event in response.json)
+
+    make_events(8)
+    with count_queries() as many:
+        response = client.get('/api/events/?expand=organizer,category')
+    assert len(response.json) == 10
+    assert len(many) == len(few)
+
+
+def test_recommended_rejects_non_integer_event_id(client):
+    response = client.get('/api/events/recommended?event_id=abc')
+    assert response.status_code == 400
+
+
+def add_event_like(app, event_id):
+    """Another upcoming event in the same category as event_id."""
+    with app.app_context():
+        event = db.session.get(Event, event_id)
+        twin = Event(title=f'{event.title} again', location=event.location, capacity=100,
+                     date=event.date, organizer_id=event.organizer_id, category_id=event.category_id)
+        db.session.add(twin)
+        db.session.commit()
+        return twin.id
+
+
+def book(client, headers, event_ids):
+    for event_id in event_ids:
+        response = client.post('/api/bookings/', json={'event_id': event_id, 'tickets_count': 1},
+                               headers=headers)
+        assert response.status_code == 201
+
+
+def test_recommended_boosts_and_fills_from_favourite_categories(app, client, auth_headers, make_events):
+    first, other, boosted = make_events(3)
+    favourite = add_event_like(app, boosted)
+    same_category = add_event_like(app, first)
+
+    # Someone else booked all three, so other and boosted are equally similar to first
+    other_user = client.post('/api/auth/register', json={
+        'username': 'other', 'email': 'other@example.com', 'password': 'testpass123'})
+    book(client, {'Authorization': f"Bearer {other_user.json['access_token']}"}, [first, other, boosted])
+    with app.app_context():
+        build_recommendations()
+
+    book(client, auth_headers, [first, favourite])
+    response = client.get('/api/events/recommended', headers=auth_headers)
+    assert response.status_code == 200
+    # boosted shares a category with favourite; same_category has no
+    # co-bookings and only comes from the category fill
+    assert [event['id'] for event in response.json] == [boosted, other, same_category]
+
+
+def test_organizer_and_category_lists_search_indexes(client, auth_headers, make_events, query_plans):
+    """EXPLAIN: an organizer's events and a category's calendar use their indexes"""
+    make_events(3)
+    steps = query_plans(lambda: client.get('/api/events/my-events/stats', headers=auth_headers))
+    assert any(step.startswith('SEARCH events USING INDEX ix_events_organizer_id') for step in steps)
+    assert not any(step.startswith('SCAN events') for step in steps)
+
+    steps = query_plans(lambda: client.get('/api/events/calendar?from=2026-01-01&to=2026-12-31&category_id=1'))
+    assert any(step.startswith('SEARCH events USING INDEX ix_events_category_id_date') for step in steps)
+    assert not any(step.startswith('SCAN events') for step in steps)
+
+
+def test_trending_skips_deleted_events(client, auth_headers, make_events):
+    """Soft-deleted events must not take the top-K slots"""
+    ids = make_events(3)
+    for tickets, event_id in enumerate(ids, start=1):
+        book(client, auth_headers, [event_id] * tickets)
+    assert client.delete(f'/api/events/{ids[-1]}', headers=auth_headers).status_code == 200
+
+    response = client.get('/api/events/trending?limit=2')
+    assert [event['id'] for event in response.json] == [ids[1], ids[0]]
@@ -0,0 +1,34 @@
+from models import db, User, Review
+
+
+def add_reviews(app, event_id, count, start=0):
+    with app.app_context():
+        for i in range(start, start + count):
+            user = User(username=f'reviewer{i}', email=f'reviewer{i}@example.com', password_hash='-')
+            db.session.add(Review(user=user, event_id=event_id, rating=4, comment='Good'))
+        db.session.commit()
+
+
+def test_list_expand_runs_fixed_number_of_queries(app, client, make_events, count_queries):
+    """?expand= loads reviewers and the event without a query per review"""
+    [event_id] = make_events(1)
+    add_reviews(app, event_id, 2)
+    with count_queries() as few:
+        response = client.get(f'/api/reviews/event/{event_id}?expand=user,event')
+    assert response.status_code == 200
+
+    add_reviews(app, event_id, 8, start=2)
+    with count_queries() as many:
+        response = client.get(f'/api/reviews/event/{event_id}?expand=user,event')
+    assert len(response.json) == 10
+    assert all(review['user'] and review['event'] for review in response.json)
+    assert len(many) == len(few)
+
+
+def test_list_searches_event_index(app, client, make_events, query_plans):
+    """EXPLAIN: an event's reviews come from (event_id, created_at), not a table scan"""
+    [event_id] = make_events(1)
+    add_reviews(app, event_id, 3)
+    steps = query_plans(lambda: client.get(f'/api/reviews/event/{event_id}'))
+    assert any(step.startswith('SEARCH reviews USING INDEX ix_reviews_event_id_created_at') for step in steps)
+    assert not any(step.startswith('SCAN reviews') for step in steps)
@@ -45,6 +45,12 @@ api.interceptors.request.use(
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    // Session-authenticated writes must echo the session's CSRF token
+    const csrfToken = localStorage.getItem('csrfToken');
+    const method = (config.method || 'get').toLowerCase();
+    if (csrfToken && !['get', 'head', 'options'].includes(method)) {
+      config.headers['X-CSRF-Token'] = csrfToken;
+    }
     return config;
   },
   (error) => {
@@ -69,7 +75,11 @@ api.interceptors.request.use(
  */
 api.interceptors.response.use(
   (response) => {
-    // Successful responses pass through unchanged
+    // Login, register and /auth/me hand out the session's CSRF token
+    const csrfToken = response.headers['x-csrf-token'];
+    if (csrfToken) {
+      localStorage.setItem('csrfToken', csrfToken);
+    }
     return response;
   },
   (error) => {
@@ -78,6 +88,7 @@ api.interceptors.response.use(
       console.warn('Authentication failed - clearing session');
       localStorage.removeItem('token');
       localStorage.removeItem('user');
+      localStorage.removeItem('csrfToken');
       window.location.href = '/login';
     }
     